@@ -1,17 +1,33 @@
 from game import WordleGame
+from batch_game import BatchWordleGame
 import random
 import math
 from itertools import product
 import string
-import pandas as pd
+import os
 from os.path import exists
 import copy
+from concurrent.futures import ProcessPoolExecutor
+import time
+import numpy as np
+import cache
+import patterns
+import word_index
+import constraints
+import trees
+import transposition
+import opening_book
+import q_policy
+import profiling
 
 class BaseAlgorithm:
     '''
     Serves as the basis for how our algorithm should be structured
     and the methods that need to be implemented.
     '''
+    # whether batch_guess can play many games at once
+    plays_batches = False
+
     def __init__(self, word_list, Verbose=False) -> None:
         self.word_list = word_list
         self.remaining_word_list = word_list
@@ -20,36 +36,145 @@ class BaseAlgorithm:
         self.bad_letters = []
         self.good_letters = []
         self.right_position = {}
+        self.patterns = None
+        self.index = None
+        self.remaining_mask = None
+        self.opening_book = None
+        self.constraints = None
+        # only make guesses that use every hint revealed so far
+        self.hard_mode = False
+
+    def get_patterns(self):
+        '''
+        Precomputed feedback for every (guess, answer) pair in word_list.
+        Loaded (or built and cached) the first time it is needed.
+        '''
+        if self.patterns is None:
+            self.patterns = patterns.get_pattern_matrix(self.word_list)
+        return self.patterns
+
+    def get_feedback(self, guess, answer) -> list:
+        '''
+        Squares the game would show for guess if the answer were answer.
+        '''
+        return self.get_patterns().squares(guess, answer)
+
+    def get_index(self):
+        '''
+        Per-letter and per-(position, letter) word masks for word_list.
+        '''
+        if self.index is None:
+            self.index = word_index.get_word_index(self.word_list)
+        return self.index
+
+    def get_remaining_mask(self) -> np.ndarray:
+        '''
+        Boolean mask over word_list of the words still possible.
+        '''
+        if self.remaining_mask is None:
+            self.remaining_mask = self.get_index().all_words()
+        return self.remaining_mask
+
+    def get_constraints(self):
+        '''
+        Per-position and letter-count constraints from the feedback so far.
+        '''
+        if self.constraints is None:
+            self.constraints = constraints.Constraints(len(self.word_list[0]))
+        return self.constraints
+
+    def get_guess_mask(self) -> np.ndarray:
+        '''
+        Boolean mask over word_list of the words that may be guessed: all of them,
+        or in hard mode only those keeping the greens and reusing the revealed letters.
+        '''
+        if not self.hard_mode:
+            return self.get_index().all_words()
+        return self.get_constraints().hard_mode_mask(self.get_index())
+
+    def fork(self):
+        '''
+        Copy of this algorithm that can carry on a game independently of the
+        original. Word lists, indexes and other shared read-only data are not
+        duplicated, only the per-game state.
+        '''
+        other = copy.copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, (list, dict, set)) and value is not self.word_list \
+                    and value is not self.remaining_word_list:
+                setattr(other, name, copy.copy(value))
+            elif isinstance(value, constraints.Constraints):
+                setattr(other, name, value.copy())
+        return other
 
     def reset(self):
         self.guesses = []
         self.bad_letters = []
         self.good_letters = []
         self.right_position = {}
+        self.remaining_word_list = self.word_list
+        self.remaining_mask = None
+        self.constraints = None
 
-    def create_tree(self, word):
+    def create_tree(self, word=None, policy='entropy', full_guesses=False):
         '''
-        This will need to be implemented for those who need a tree to conduct a search.
-
-        Notes: I would make this so it updates based on a new root word then the possible words
-        as branches or leafs.
+        Decision tree of guesses over word_list, keyed on feedback, with word as the root
+        guess (picked by the policy if None). Built once per word list and policy and then
+        loaded from the word_lists folder; see trees.py.
 
         it may look something like https://www.poirrier.ca/notes/wordle/ except more simple.
-        recursion might be useful for this.
         '''
-        # TO-DO
-        pass
+        return trees.get_tree(self.word_list, policy, word, full_guesses)
 
     def make_guess(self) -> str:
         pass
 
+    def batch_guess(self, batch, games) -> np.ndarray:
+        '''
+        Word indices to guess in the given games of a BatchWordleGame (see
+        batch_game.py), picked for all of them at once from the candidates
+        the batch tracks. Only algorithms with plays_batches implement it.
+        '''
+        raise NotImplementedError
+
+    def batch_first_guesses(self, games) -> np.ndarray:
+        '''
+        A random first guess per game, drawn like make_first_guess draws one.
+        '''
+        return np.array([random.randrange(len(self.word_list)) for _ in games], dtype=np.int64)
+
+    def use_opening_book(self, policy, full_guesses=False):
+        '''
+        Play the first two turns from the precomputed opening book for a scoring policy
+        (see opening_book.py) instead of picking a random first word.
+        '''
+        self.opening_book = opening_book.get_book(self.word_list, policy, full_guesses)
+
     def make_first_guess(self) -> str:
-        guess = random.choice(self.word_list)
+        if self.opening_book is not None:
+            guess = self.opening_book.first_guess()
+        else:
+            guess = random.choice(self.word_list)
         self.guesses.append(guess)
         return guess
 
+    def book_guess(self, previous_guess):
+        '''
+        Second guess from the opening book, or None if the book does not cover this turn.
+        '''
+        if self.opening_book is None or len(self.guesses) != 1:
+            return None
+        p_guess, squares = previous_guess
+        if p_guess != self.opening_book.first_guess():
+            return None
+        guess = self.opening_book.second_guess(patterns.encode_squares(squares))
+        if guess is not None and self.hard_mode and not self.get_guess_mask()[self.get_index().position[guess]]:
+            return None
+        return guess
+
     def update_information(self, previous_guess):
         p_guess, squares = previous_guess
+        self.get_constraints().update(p_guess, squares)
 
         for idx, square in enumerate(squares):
             if square=="GREY":
@@ -65,21 +190,25 @@ class BaseAlgorithm:
                 btemp.add(i)
         self.bad_letters = list(btemp)
 
+    @profiling.timed_filter
     def update_remaining_words(self):
-        self.remaining_word_list = [word for word in self.word_list if \
-                            all(good_letter in word for good_letter in self.good_letters) \
-                            and \
-                            all(bad_letter not in word for bad_letter in self.bad_letters) \
-                            and \
-                            all(word[i]==self.right_position[i] for i in self.right_position.keys()) \
-                            and \
-                            word not in self.guesses]
+        # The constraints only ever get tighter, so narrow last turn's
+        # candidates instead of rescanning the whole word list.
+        index = self.get_index()
+        mask = self.get_constraints().narrow(index, self.get_remaining_mask())
+        for word in self.guesses:
+            if word in index.position:
+                mask[index.position[word]] = False
+        self.remaining_mask = mask
+        self.remaining_word_list = index.words_in(mask)
 
 class HumanAlgorithm(BaseAlgorithm):
     '''
     Meant to mimic the typical human strategy; picks a random word that
     is possible given the feedback on the most previous word.
     '''
+    plays_batches = True
+
     def __init__(self, word_list) -> None:
         super().__init__(word_list)
 
@@ -94,6 +223,13 @@ class HumanAlgorithm(BaseAlgorithm):
         self.guesses.append(guess)
         return guess
 
+    def batch_guess(self, batch, games) -> np.ndarray:
+        guesses = np.empty(len(games), dtype=np.int64)
+        first = batch.turn_number[games] == 0
+        guesses[first] = self.batch_first_guesses(games[first])
+        guesses[~first] = batch.random_candidates(games[~first])
+        return guesses
+
 
 class NaiveFrequencyAlgorithm(BaseAlgorithm):
     '''
@@ -104,20 +240,11 @@ class NaiveFrequencyAlgorithm(BaseAlgorithm):
 
     Implementation inspired by - https://ido-frizler.medium.com/the-science-behind-wordle-67c8112ed0d1
     '''
+    plays_batches = True
 
     def __init__(self, word_list) -> None:
         super().__init__(word_list)
 
-    def countCharacterFrequency(self) -> dict:
-        countDict = {}
-        for i in range(ord('a'),ord('z')+1):
-            countDict[chr(i)] = 0
-        for i in self.remaining_word_list:
-            unique_chars = set(list(i.lower().strip()))
-            for c in unique_chars:
-                countDict[c]+=1
-        return countDict
-
     def make_guess(self,previous_guess=None) -> str:
         if previous_guess==None:
             return super().make_first_guess()
@@ -125,21 +252,33 @@ class NaiveFrequencyAlgorithm(BaseAlgorithm):
         super().update_information(previous_guess)
         super().update_remaining_words()
 
-        frequency = self.countCharacterFrequency()
-
-        max_aggregate = 0
+        # aggregate frequency of each remaining word's distinct letters, as one
+        # product of the per-letter counts with the word x letter table
+        index = self.get_index()
+        mask = self.get_remaining_mask()
+        remaining = index.has_letter[:, mask]
+        frequency = remaining.sum(axis=1)
+        agg_freq = frequency @ remaining
         guess = ""
-
-        for i in self.remaining_word_list:
-            agg_freq = 0
-            for j in set(list(i.lower().strip())):
-                agg_freq+=frequency[j]
-            if(agg_freq>max_aggregate):
-                max_aggregate = agg_freq
-                guess = i
+        if len(agg_freq) and agg_freq.max() > 0:
+            guess = self.word_list[np.flatnonzero(mask)[np.argmax(agg_freq)]]
         self.guesses.append(guess)
         return guess
 
+    def batch_guess(self, batch, games) -> np.ndarray:
+        # the same scores as make_guess for every game at once: letter counts over
+        # each game's candidates, then each word's sum over its distinct letters
+        guesses = np.empty(len(games), dtype=np.int64)
+        first = batch.turn_number[games] == 0
+        guesses[first] = self.batch_first_guesses(games[first])
+        candidates = batch.candidates[games[~first]]
+        has_letter = self.get_index().has_letter.astype(np.float32)
+        frequency = candidates.astype(np.float32) @ has_letter.T
+        agg_freq = frequency @ has_letter
+        agg_freq[~candidates] = -1
+        guesses[~first] = agg_freq.argmax(axis=1)
+        return guesses
+
 
 
 class MaxEntropyAlgorithm(BaseAlgorithm):
@@ -153,51 +292,199 @@ class MaxEntropyAlgorithm(BaseAlgorithm):
     Youtube(3 Blue 1 Brown) - https://youtu.be/v68zYyaEmEA
     '''
 
-    def __init__(self, word_list) -> None:
+    def __init__(self, word_list, full_guesses=False, use_book=True, hard_mode=False, time_budget=None,
+                 sample_size=2000) -> None:
         super().__init__(word_list)
+        # score every word in word_list as a guess, not only the possible answers
+        self.full_guesses = full_guesses
+        self.hard_mode = hard_mode
+        # seconds allowed per guess (None for no limit) and, when limited, the number of
+        # possible answers above which entropies are estimated from a random sample of them
+        self.time_budget = time_budget
+        self.sample_size = sample_size
+        # whether the last guess had the highest exact entropy, or is the best found in time
+        self.exact = True
+        if use_book:
+            self.use_opening_book('entropy', full_guesses)
 
     def calculate_entropy(self,word) -> float:
-        patterns = {}
-        for w in self.remaining_word_list:
-            p = ""
-            for i in range(len(w)):
-                if w[i]==word[i]:
-                    p+="g"
-                elif w[i] in word:
-                    p+="y"
-                elif w[i] not in word:
-                    p+="b"
-            if p in patterns:
-                patterns[p]+=1
-            else:
-                patterns[p]=1
+        pattern_matrix = self.get_patterns()
+        answer_idx = pattern_matrix.indices(self.remaining_word_list)
+        return patterns.pattern_entropies(pattern_matrix.matrix, [pattern_matrix.index[word]], answer_idx)[0]
 
-        entropy = 0
-        for k,v in patterns.items():
-            if v!=0:
-                prob = v/len(self.remaining_word_list)
-                info = -1 * math.log(prob,2)
-                entropy+=prob*info
+    def order_by_frequency(self, guess_idx, answer_idx) -> np.ndarray:
+        '''
+        Guesses sorted so the most promising come first: possible answers, then the
+        most common letters among the possible answers (each letter counted once).
+        '''
+        has_letter = self.get_index().has_letter
+        frequency = has_letter[:, answer_idx].sum(axis=1)
+        score = frequency @ has_letter[:, guess_idx]
+        is_answer = np.isin(guess_idx, answer_idx)
+        return guess_idx[np.lexsort((-score, ~is_answer))]
 
-        return entropy
+    def score_guesses(self, guess_idx, answer_idx, start_time, time_budget) -> tuple:
+        '''
+        Entropy of each guess in guess_idx. With no time budget all guesses are scored in one
+        batch; otherwise the most promising guesses are scored first, chunk by chunk, until the
+        budget (counted from start_time) runs out, and the rest get -inf. Returns the guesses
+        (reordered if budgeted), their entropies and whether every entropy is exact.
+        '''
+        pattern_matrix = self.get_patterns()
+        if time_budget is None:
+            return guess_idx, patterns.pattern_entropies(pattern_matrix.matrix, guess_idx, answer_idx), True
+
+        guess_idx = self.order_by_frequency(guess_idx, answer_idx)
+        sample_idx = answer_idx
+        if len(answer_idx) > self.sample_size:
+            rng = np.random.default_rng(random.getrandbits(32))
+            sample_idx = np.sort(rng.choice(answer_idx, self.sample_size, replace=False))
+        entropies = np.full(len(guess_idx), -np.inf)
+        chunk = max(1, (1 << 18) // max(len(sample_idx), patterns.DENSE_PATTERNS))
+        for start in range(0, len(guess_idx), chunk):
+            entropies[start:start + chunk] = patterns.pattern_entropies(
+                pattern_matrix.matrix, guess_idx[start:start + chunk], sample_idx)
+            if time.perf_counter() - start_time > time_budget:
+                break
+        exact = len(sample_idx) == len(answer_idx) and start + chunk >= len(guess_idx)
+        return guess_idx, entropies, exact
 
+    def make_guess(self,previous_guess=None, time_budget=None) -> str:
+        start_time = time.perf_counter()
+        if time_budget is None:
+            time_budget = self.time_budget
+        if previous_guess==None:
+            self.exact = self.opening_book is not None
+            return super().make_first_guess()
 
-    def make_guess(self,previous_guess=None) -> str:
+        super().update_information(previous_guess)
+        super().update_remaining_words()
+
+        guess = self.book_guess(previous_guess)
+        if guess is not None:
+            self.exact = True
+            self.guesses.append(guess)
+            return guess
+
+        answer_idx = np.flatnonzero(self.get_remaining_mask())
+        if self.full_guesses:
+            guess_idx = np.flatnonzero(self.get_guess_mask())
+        else:
+            guess_idx = answer_idx
+        if len(guess_idx) == 0:
+            # the feedback ruled out every word, so there is nothing to score
+            self.exact = False
+            return super().make_first_guess()
+
+        guess_idx, entropies, self.exact = self.score_guesses(guess_idx, answer_idx, start_time, time_budget)
+
+        # among equally good guesses prefer one that could still be the answer
+        is_answer = np.isin(guess_idx, answer_idx)
+        best = np.flatnonzero(np.isclose(entropies, entropies.max()))
+        if is_answer[best].any():
+            best = best[is_answer[best]]
+        guess = self.word_list[guess_idx[best[0]]]
+
+        self.guesses.append(guess)
+        return guess
+
+class LookaheadEntropyAlgorithm(MaxEntropyAlgorithm):
+    '''
+    Two-step version of MaxEntropyAlgorithm, following the 3Blue1Brown analysis cited there.
+
+    The top_k guesses by entropy are each scored by their entropy plus the expected entropy of
+    the best second guess over their feedback buckets, and the guess with the highest total is
+    picked. The best second-step entropy of a bucket only depends on the set of answers in it,
+    so it is cached in a transposition table shared by every game in the process. The first
+    step is scored as MaxEntropyAlgorithm scores it under time_budget; the candidates are then
+    searched best first, checking the deadline before every bucket, and a candidate cut short
+    is dropped, so the guess is never worse than the one-step choice.
+
+    The second guess considered for a bucket is any word with full_guesses, or one of the
+    bucket's answers otherwise. In hard mode it is always one of the bucket's answers: they are
+    exactly the hard-mode guesses that can still win, and unlike the hard-mode guess mask they
+    do not depend on the history that led to the bucket.
+    '''
+    def __init__(self, word_list, top_k=10, time_budget=1.0, full_guesses=False, use_book=True,
+                 hard_mode=False, table_size=1000000, sample_size=2000) -> None:
+        super().__init__(word_list, full_guesses, use_book, hard_mode, time_budget, sample_size)
+        self.top_k = top_k
+        # second guesses from the whole word list, or from the bucket's answers
+        self.full_second_guesses = full_guesses and not hard_mode
+        self.table = transposition.get_table(word_list, 'lookahead_%d' % self.full_second_guesses, table_size)
+
+    def second_step_entropy(self, answer_idx) -> float:
+        '''
+        Entropy of the best second guess when answer_idx are the possible answers.
+        '''
+        if len(answer_idx) <= 1:
+            return 0.0
+        key = transposition.fingerprint(answer_idx)
+        entropy = self.table.get(key)
+        if entropy is None:
+            guess_idx = np.arange(len(self.word_list)) if self.full_second_guesses else answer_idx
+            entropy = float(patterns.pattern_entropies(self.get_patterns().matrix, guess_idx, answer_idx).max())
+            self.table.put(key, entropy)
+        return entropy
+
+    def lookahead_entropy(self, guess, answer_idx, deadline=None):
+        '''
+        Expected entropy of the best second guess after guessing guess, or None if the
+        deadline (a perf_counter time) passed before every bucket was scored.
+        '''
+        pattern_matrix = self.get_patterns()
+        solved = 3**pattern_matrix.word_length - 1
+        codes = pattern_matrix.matrix[guess][answer_idx]
+        values, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+        expected = 0.0
+        for b in range(len(values)):
+            if values[b] == solved:
+                continue
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            expected += counts[b] / len(answer_idx) * self.second_step_entropy(answer_idx[inverse == b])
+        return expected
+
+    def make_guess(self, previous_guess=None, time_budget=None) -> str:
+        start_time = time.perf_counter()
+        if time_budget is None:
+            time_budget = self.time_budget
         if previous_guess==None:
+            self.exact = self.opening_book is not None
             return super().make_first_guess()
 
         super().update_information(previous_guess)
         super().update_remaining_words()
 
-        max_entropy = 0
-        guess = random.choice(self.remaining_word_list)
+        guess = self.book_guess(previous_guess)
+        if guess is not None:
+            self.exact = True
+            self.guesses.append(guess)
+            return guess
 
-        for word in self.remaining_word_list:
-            entropy = self.calculate_entropy(word)
-            if(entropy>max_entropy):
-                max_entropy = entropy
-                guess = word
+        answer_idx = np.flatnonzero(self.get_remaining_mask())
+        guess_idx = np.flatnonzero(self.get_guess_mask()) if self.full_guesses else answer_idx
+        if len(guess_idx) == 0:
+            # the feedback ruled out every word, so there is nothing to score
+            self.exact = False
+            return super().make_first_guess()
+        guess_idx, entropies, self.exact = self.score_guesses(guess_idx, answer_idx, start_time, time_budget)
+        # best first; among equally good guesses, possible answers first
+        order = np.lexsort((~np.isin(guess_idx, answer_idx), -entropies))[:self.top_k]
+        order = order[np.isfinite(entropies[order])]
+
+        deadline = None if time_budget is None else start_time + time_budget
+        best_guess, best_score = guess_idx[order[0]], -math.inf
+        for i in order:
+            lookahead = self.lookahead_entropy(guess_idx[i], answer_idx, deadline)
+            if lookahead is None:
+                self.exact = False
+                break
+            score = entropies[i] + lookahead
+            if score > best_score + 1e-9:
+                best_guess, best_score = guess_idx[i], score
 
+        guess = self.word_list[best_guess]
         self.guesses.append(guess)
         return guess
 
@@ -229,6 +516,7 @@ class GeneticAlgortihm(BaseAlgorithm):
 
     def update_information(self, previous_guess):
         p_guess, squares = previous_guess
+        self.get_constraints().update(p_guess, squares)
         ind_fitness = 0
 
         for idx, square in enumerate(squares):
@@ -338,6 +626,130 @@ class GeneticAlgortihm(BaseAlgorithm):
         self.guesses.append(guess)
         return guess
 
+def choose_visited_action(actions, q_values, counts, total_visits) -> int:
+    '''
+    QLearn's action among actions that are all in the policy: the first one visited at
+    least 5% less often than the one before, else the highest Q-value (ties going to the
+    last one).
+    '''
+    guess = None
+    count_perc = 1
+    count_percs = counts[actions] / total_visits
+    start = 0
+    while True:
+        below = np.flatnonzero(count_perc - count_percs[start:] >= 0.05)
+        if len(below) == 0:
+            break
+        start += below[0]
+        guess = actions[start]
+        count_perc = count_percs[start]
+        start += 1
+    if guess is None:
+        guess = actions[len(actions) - 1 - np.argmax(q_values[actions][::-1])]
+    return guess
+
+
+def run_q_episodes(word_list, q_values, visited, counts, episodes, learning_rate, lamb):
+    '''
+    Play QLearn training episodes, updating q_values, visited and counts (arrays aligned
+    with word_list) in place.
+    '''
+    position = word_index.get_word_index(word_list).position
+    total_visits = int(counts.sum())
+
+    game = WordleGame(word_length=len(word_list[0]), word_source="manual", word_list=word_list)
+    algo = HumanAlgorithm(word_list=word_list)
+    for i in range(episodes):
+        game.restart()
+        game.answer = random.choice(word_list)
+        algo.reset()
+
+        game_status = game.get_game_status()
+        game.guess(algo.make_guess(game.get_last_guess()))
+        counts[position[game.get_last_guess()[0]]] += 1
+        total_visits += 1
+        while game_status==0:
+            # Pick action: the first action not in the policy yet, else see choose_visited_action
+            actions = np.flatnonzero(algo.get_remaining_mask())
+            unvisited = np.flatnonzero(~visited[actions])
+            if len(unvisited) > 0:
+                guess = actions[unvisited[0]]
+            else:
+                guess = choose_visited_action(actions, q_values, counts, total_visits)
+
+            # Perform action
+            game.guess(word_list[guess])
+            counts[guess] += 1
+            total_visits += 1
+            algo.update_information(game.get_last_guess())
+            algo.update_remaining_words()
+            game_status = game.get_game_status()
+
+            # Update Q-values
+            s = position[game.guesses[-2]]
+            s_prime = position[game.guesses[-1]]
+            reward = -1
+            if game_status == 1: reward = 10
+
+            actions = np.flatnonzero(algo.get_remaining_mask() & visited)
+            max_q_val = q_values[actions].max() if len(actions) > 0 else 0
+
+            visited[s] = True
+            q_values[s] = q_values[s] + learning_rate * (-1 + lamb*max_q_val - q_values[s])
+
+
+def run_q_batch_episodes(word_list, q_values, visited, counts, episodes, learning_rate, lamb, batch_size=256):
+    '''
+    Play QLearn training episodes batch_size at a time in lockstep on a BatchWordleGame, with
+    the same action rule as run_q_episodes. Each turn the actions of every game are picked from
+    the values at the start of the turn, and the Q-value of each previous guess then takes one
+    update step towards the mean target of the games that made that guess, rather than one step
+    per game as run_q_episodes would take in turn.
+    '''
+    total_visits = int(counts.sum())
+    batch = BatchWordleGame(word_list, n_games=0, track_candidates=True)
+    for start in range(0, episodes, batch_size):
+        n = min(batch_size, episodes - start)
+        batch.restart([random.randrange(len(word_list)) for _ in range(n)])
+        # the first guess is random, as HumanAlgorithm makes it
+        guesses = np.array([random.randrange(len(word_list)) for _ in range(n)], dtype=np.int64)
+        batch.guess(guesses, np.arange(n))
+        np.add.at(counts, guesses, 1)
+        total_visits += n
+
+        games = batch.active()
+        while len(games):
+            candidates = batch.candidates[games]
+            # the first action not in the policy yet, else see choose_visited_action
+            unvisited = candidates & ~visited
+            guesses = unvisited.argmax(axis=1)
+            for g in np.flatnonzero(~unvisited.any(axis=1)):
+                guesses[g] = choose_visited_action(np.flatnonzero(candidates[g]), q_values, counts, total_visits)
+
+            turns = batch.turn_number[games]
+            batch.guess(guesses, games)
+            np.add.at(counts, guesses, 1)
+            total_visits += len(games)
+
+            # Update Q-values of the previous guesses, one step per word towards the mean
+            # target of the games that guessed it
+            s = batch.guesses[games, turns - 1]
+            next_values = np.where(batch.candidates[games] & visited, q_values, -np.inf).max(axis=1)
+            max_q_val = np.where(np.isfinite(next_values), next_values, 0)
+            words, inverse, n = np.unique(s, return_inverse=True, return_counts=True)
+            targets = np.bincount(inverse, weights=-1 + lamb * max_q_val) / n
+            visited[words] = True
+            q_values[words] += learning_rate * (targets - q_values[words])
+            games = batch.active()
+
+
+def _q_learning_worker(args):
+    word_list, q_values, visited, counts, episodes, learning_rate, lamb, seed = args
+    random.seed(seed)
+    run_q_episodes(word_list, q_values, visited, counts, episodes, learning_rate, lamb)
+    return q_values, visited, counts
+
+
 class QLearn(BaseAlgorithm):
     '''
     Use Q-learning to decide optimal policy. Our state will be the previously guessed word. The reward for a
@@ -361,122 +773,454 @@ class QLearn(BaseAlgorithm):
     This is similar to other methods that find the expected values of letters. The difference is the agent will find
     the values via *** reinforcement *** and it will be for words rather than letters.
     '''
+    policy_file = 'q_policy.bin'
+    checkpoint_file = 'q_checkpoint.npz'
+
     def __init__(self, word_list, Verbose=False) -> None:
         super().__init__(word_list, Verbose)
-        self.policy_or_utilities = {}
-        self.counts = [0]*len(word_list)
-        file_exists = exists('q_policy.csv')
-        if not file_exists:
+        # Q-values aligned with word_list, NaN for words without one (see q_policy.py)
+        self.policy_or_utilities = None
+        self.counts = np.zeros(len(word_list), dtype=np.int64)
+        if not exists(self.policy_file) and exists('q_policy.csv'):
+            q_policy.convert_csv_policy('q_policy.csv', self.policy_file, self.word_list)
+        # the shipped policy is for the default word list; others get their own files
+        policy_file = q_policy.policy_path(self.word_list, self.policy_file)
+        if policy_file != self.policy_file:
+            self.policy_file = policy_file
+            self.checkpoint_file = cache.cache_path('q_checkpoint', self.word_list)
+        if not exists(self.policy_file):
             self.train_agent()
         else:
-            self.policy_or_utilities = pd.read_csv('q_policy.csv')
+            self.policy_or_utilities, _ = q_policy.load_policy(self.policy_file, self.word_list)
 
-    def train_agent(self):
+    def train_agent(self, episodes=2000, workers=1, sync_every=100, seed=0, checkpoint_every=200,
+                    resume=True, warm_start=False, batch_size=None):
+        '''
+        Q-values, visit flags and visit counts are arrays indexed like word_list (looked up
+        through the word index), and the total number of visits is kept as a running sum, so
+        each step costs a few array operations over the candidate actions.
+
+        With batch_size set, the episodes of a single process are played batch_size at a time
+        in lockstep on a BatchWordleGame (see run_q_batch_episodes).
+
+        With workers > 1 the episodes are played in rounds across a process pool. In each
+        round every worker plays sync_every episodes starting from the shared table, and
+        the changes are merged back: Q-values by averaging the change of every worker that
+        updated a word, visit counts by adding them up. Staleness is bounded by sync_every.
+
+        Every checkpoint_every episodes (or every round when training in parallel) the
+        Q-values, visit counts, random state and episode number are saved to
+        checkpoint_file. If resume is True and a checkpoint exists, training carries on
+        from it. If warm_start is True, training starts from the Q-values in policy_file
+        and plays episodes more episodes. The checkpoint is removed once training finishes.
+        '''
         learning_rate = 0.1 # alpha
         lamb = 0.1 # lambda
 
-        for i in range(2000):
-            game = WordleGame()
-            algo = HumanAlgorithm(word_list=game.get_word_list())
+        q_values = np.zeros(len(self.word_list))
+        visited = np.zeros(len(self.word_list), dtype=bool)
+        previous_episodes = 0
+        if warm_start and exists(self.policy_file):
+            policy, header = q_policy.load_policy(self.policy_file, self.word_list)
+            visited = ~np.isnan(policy)
+            q_values[visited] = policy[visited]
+            previous_episodes = header['hyperparameters'].get('episodes', 0)
+
+        episode = 0
+        if resume and exists(self.checkpoint_file):
+            checkpoint = q_policy.load_checkpoint(self.checkpoint_file, self.word_list)
+            q_values, visited, self.counts = checkpoint['q_values'], checkpoint['visited'], checkpoint['counts']
+            episode, previous_episodes = checkpoint['episode'], checkpoint['previous_episodes']
+            random.setstate(checkpoint['random_state'])
+            print(f"Resuming from episode {episode}")
+
+        start_episode = episode
+        start_time = time.perf_counter()
+        if workers <= 1:
+            while episode < episodes:
+                n = min(checkpoint_every, episodes - episode)
+                if batch_size:
+                    run_q_batch_episodes(self.word_list, q_values, visited, self.counts, n, learning_rate, lamb,
+                                         batch_size)
+                else:
+                    run_q_episodes(self.word_list, q_values, visited, self.counts, n, learning_rate, lamb)
+                episode += n
+                q_policy.save_checkpoint(self.checkpoint_file, self.word_list, q_values, visited, self.counts,
+                                         episode, previous_episodes, random.getstate())
+                print(f"Percent Complete: {episode / episodes * 100}")
+        else:
+            round_size = workers * sync_every
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                while episode < episodes:
+                    r = episode // round_size
+                    jobs = []
+                    for w in range(workers):
+                        n = min(sync_every, episodes - episode - w * sync_every)
+                        if n > 0:
+                            jobs.append((self.word_list, q_values, visited, self.counts, n, learning_rate,
+                                         lamb, '%d-%d-%d' % (seed, r, w)))
+                    q_changes = np.zeros(len(self.word_list))
+                    updates = np.zeros(len(self.word_list), dtype=np.int64)
+                    count_changes = np.zeros(len(self.word_list), dtype=np.int64)
+                    for w_q_values, w_visited, w_counts in executor.map(_q_learning_worker, jobs):
+                        updated = w_visited & ((w_q_values != q_values) | ~visited)
+                        q_changes[updated] += w_q_values[updated] - q_values[updated]
+                        updates += updated
+                        count_changes += w_counts - self.counts
+                    q_values += q_changes / np.maximum(updates, 1)
+                    visited |= updates > 0
+                    self.counts += count_changes
+                    episode = min(episodes, episode + round_size)
+                    q_policy.save_checkpoint(self.checkpoint_file, self.word_list, q_values, visited, self.counts,
+                                             episode, previous_episodes, random.getstate())
+                    print(f"Percent Complete: {episode / episodes * 100}")
+
+        episodes_per_sec = (episode - start_episode) / (time.perf_counter() - start_time)
+        print(f'Training complete! ({episodes_per_sec:.1f} episodes/sec)\n')
+        q_values[~visited] = np.nan
+        q_policy.save_policy(self.policy_file, self.word_list, q_values, episodes=previous_episodes + episodes,
+                             learning_rate=learning_rate, lamb=lamb)
+        if exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+        self.policy_or_utilities, _ = q_policy.load_policy(self.policy_file, self.word_list)
+        return episodes_per_sec
+
+    def make_guess(self, previous_guess=None) -> str:
+        if previous_guess == None:
+            return super().make_first_guess()
 
-            game_status = game.get_game_status()
-            game.guess(algo.make_guess(game.get_last_guess()))
-            self.counts[self.word_list.index(game.get_last_guess()[0])] += 1
-            while game_status==0:
-                # Pick action:
-                actions = algo.remaining_word_list
-                guess = None
-                for a in actions:
-                    if a not in self.policy_or_utilities.keys():
-                        guess = a
-                        break
-                if guess is None:
-                    count_perc = 1
-                    for a in actions:
-                        a_count_perc = self.counts[self.word_list.index(a)] / sum(self.counts)
-                        if count_perc - a_count_perc >= 0.05:
-                            guess = a
-                            count_perc = a_count_perc
-                if guess is None:
-                    max_q_val = -100000
-                    for a in actions:
-                        if self.policy_or_utilities[a] >= max_q_val:
-                            guess = a
-                            max_q_val = self.policy_or_utilities[a]
-
-                # Perform action
-                game.guess(guess)
-                self.counts[self.word_list.index(guess)] += 1
-                algo.update_information(game.get_last_guess())
-                algo.update_remaining_words()
-                game_status = game.get_game_status()
+        super().update_information(previous_guess)
+        super().update_remaining_words()
 
-                # Update Q-values
-                s = game.guesses[-2]
-                s_prime = game.guesses[-1]
-                reward = -1
-                if game_status == 1: reward = 10
+        # the remaining word with the highest Q-value, ties going to the last one
+        actions = np.flatnonzero(self.get_remaining_mask())
+        q_values = self.policy_or_utilities[actions]
+        actions = actions[q_values >= -1000]
+        if len(actions) == 0:
+            return super().make_first_guess()
 
-                actions = algo.remaining_word_list
-                max_q_val = -1000
-                for a in actions:
-                    if a in self.policy_or_utilities.keys():
-                        if self.policy_or_utilities[a] > max_q_val:
-                            max_q_val = self.policy_or_utilities[a]
-                if max_q_val == -1000:
-                    max_q_val = 0
+        q_values = self.policy_or_utilities[actions]
+        guess = self.word_list[actions[len(actions) - 1 - np.argmax(q_values[::-1])]]
+        self.guesses.append(guess)
+        return guess
 
-                q_val_s = 0
-                if s in self.policy_or_utilities.keys():
-                    q_val_s = self.policy_or_utilities[s]
+class LetterQLearn(BaseAlgorithm):
+    '''
+    Q-learning on the per-letter state suggested in the QLearn docstring
+    (https://andrewkho.github.io/wordle-solver/). For each letter and each position we track
+    whether the letter has not been tried (UNKNOWN), may be there (MAYBE), is there (YES)
+    or cannot be there (NO). This state is Markov: it summarizes all the feedback so far.
+
+    Q(s, a) for guessing word a is the sum over positions p of a dense table entry
+    W[turn, p, letter of a at p, state of that letter at p], so the values of all candidate
+    words come out of one fancy-indexing operation per turn and a TD update touches one
+    entry per position. The reward is -1 per guess and 10 for a win. Training is epsilon
+    greedy over the words still possible; playing is greedy.
+    '''
+    UNKNOWN = 0
+    MAYBE = 1
+    YES = 2
+    NO = 3
 
-                self.policy_or_utilities[s] = q_val_s + learning_rate * (-1 + lamb*max_q_val - q_val_s)
+    policy_file = 'letter_q_policy.npz'
 
-            if i % 200 == 0:
-                print(f"Percent Complete: {i / 2000 * 100}")
-                #print('Q-vals: ', self.policy_or_utilities.items
+    def __init__(self, word_list, max_turns=6, Verbose=False) -> None:
+        super().__init__(word_list, Verbose)
+        index = self.get_index()
+        self.max_turns = max_turns
+        self.letter_ids = index.letter_ids
+        self.q_table = np.zeros((max_turns, index.word_length, len(index.letter_row), 4))
+        self.letter_state = None
+        self.reset()
+        # the shipped policy is for the default word list; others get their own files
+        if not self.trained_on(self.policy_file):
+            self.policy_file = cache.cache_path('letter_q_policy', self.word_list, 'turns%d' % max_turns)
+        if exists(self.policy_file):
+            self.q_table = np.load(self.policy_file)['q_table']
+        else:
+            self.train_agent()
+
+    def trained_on(self, path) -> bool:
+        '''
+        Whether path holds a table trained on word_list with this table shape.
+        '''
+        if not exists(path):
+            return False
+        data = np.load(path)
+        return str(data['word_list_hash']) == cache.word_list_hash(self.word_list) \
+            and data['q_table'].shape == self.q_table.shape
 
-        print('Training complete!\n')
-        self.policy_or_utilities = pd.DataFrame(data=self.policy_or_utilities, index=[0])
-        self.policy_or_utilities.to_csv('q_policy.csv')
+    def reset(self):
+        super().reset()
+        self.letter_state = np.full(self.q_table.shape[2:0:-1], self.UNKNOWN, dtype=np.int64)
+
+    def fork(self):
+        # letter_state is updated in place, so every copy needs its own
+        other = super().fork()
+        other.letter_state = self.letter_state.copy()
+        return other
+
+    def update_letter_state(self, previous_guess):
+        p_guess, squares = previous_guess
+        letter_row = self.get_index().letter_row
+        found = {p_guess[i] for i, square in enumerate(squares) if square != "GREY"}
+        for i, square in enumerate(squares):
+            letter = letter_row[p_guess[i]]
+            if square == "GREEN":
+                self.letter_state[letter, i] = self.YES
+            elif square == "YELLOW":
+                self.letter_state[letter, i] = self.NO
+                unknown = self.letter_state[letter] == self.UNKNOWN
+                self.letter_state[letter, unknown] = self.MAYBE
+            elif p_guess[i] in found:
+                self.letter_state[letter, i] = self.NO
+            else:
+                self.letter_state[letter, :] = self.NO
+
+    def action_values(self, actions, turn) -> np.ndarray:
+        '''
+        Q-values of guessing each word index in actions in the current state.
+        '''
+        ids = self.letter_ids[actions]
+        positions = np.arange(ids.shape[1])
+        states = self.letter_state[ids, positions]
+        return self.q_table[min(turn, self.max_turns - 1), positions, ids, states].sum(axis=1)
+
+    def train_agent(self, episodes=3000, learning_rate=0.05, gamma=0.9, epsilon=0.3):
+        game = WordleGame(word_length=len(self.word_list[0]), word_source="manual", word_list=self.word_list)
+        positions = np.arange(self.q_table.shape[1])
+        start_time = time.perf_counter()
+        for i in range(episodes):
+            game.restart()
+            game.answer = random.choice(self.word_list)
+            self.reset()
+            explore = epsilon * (1 - i / episodes)
+
+            game_status = game.get_game_status()
+            while game_status == 0:
+                turn = min(len(self.guesses), self.max_turns - 1)
+                actions = np.flatnonzero(self.get_remaining_mask())
+                values = self.action_values(actions, turn)
+                if random.random() < explore:
+                    choice = random.randrange(len(actions))
+                else:
+                    choice = int(np.argmax(values))
+                ids = self.letter_ids[actions[choice]]
+                states = self.letter_state[ids, positions]
+
+                guess = self.word_list[actions[choice]]
+                self.guesses.append(guess)
+                game.guess(guess)
+                game_status = game.get_game_status()
+                reward = 10 if game_status == 1 else -1
+
+                target = reward
+                if game_status == 0:
+                    self.update_letter_state(game.get_last_guess())
+                    super().update_information(game.get_last_guess())
+                    super().update_remaining_words()
+                    next_actions = np.flatnonzero(self.get_remaining_mask())
+                    target += gamma * self.action_values(next_actions, turn + 1).max()
+                error = target - values[choice]
+                self.q_table[turn, positions, ids, states] += learning_rate * error / len(positions)
+
+            if i % 500 == 0:
+                print(f"Percent Complete: {i / episodes * 100}")
+
+        episodes_per_sec = episodes / (time.perf_counter() - start_time)
+        print(f'Training complete! ({episodes_per_sec:.1f} episodes/sec)\n')
+        self.reset()
+        with cache.atomic_write(self.policy_file) as f:
+            np.savez(f, word_list_hash=cache.word_list_hash(self.word_list), q_table=self.q_table,
+                     episodes=episodes, learning_rate=learning_rate, gamma=gamma, epsilon=epsilon)
+        return episodes_per_sec
 
     def make_guess(self, previous_guess=None) -> str:
-        if previous_guess == None:
-            return super().make_first_guess()
+        if previous_guess is not None:
+            self.update_letter_state(previous_guess)
+            super().update_information(previous_guess)
+            super().update_remaining_words()
+
+        actions = np.flatnonzero(self.get_remaining_mask())
+        values = self.action_values(actions, len(self.guesses))
+        guess = self.word_list[actions[np.argmax(values)]]
+        self.guesses.append(guess)
+        return guess
 
-        super().update_information(previous_guess)
-        super().update_remaining_words()
+class DecisionTreeAlgorithm(BaseAlgorithm):
+    '''
+    Follows a precomputed decision tree (see BaseAlgorithm.create_tree): every turn is a
+    single lookup of the child node for the feedback just received. The tree is loaded
+    on the first guess, and built the first time a word list and policy are used.
+    '''
+    def __init__(self, word_list, policy='entropy', first_guess=None, full_guesses=False, Verbose=False) -> None:
+        super().__init__(word_list, Verbose)
+        self.policy = policy
+        self.first_guess = first_guess
+        self.full_guesses = full_guesses
+        self.tree = None
+        self.node = 0
 
-        min_q_val = -1000
-        guess = None
-        for a in self.remaining_word_list:
-            if a in self.policy_or_utilities.keys():
-                if self.policy_or_utilities[a][0] >= min_q_val:
-                    guess = a
-                    min_q_val = self.policy_or_utilities[a][0]
+    def reset(self):
+        super().reset()
+        self.node = 0
 
-        if guess is not None:
-            return guess
+    def make_guess(self, previous_guess=None) -> str:
+        if self.tree is None:
+            self.tree = self.create_tree(self.first_guess, self.policy, self.full_guesses)
+
+        if previous_guess==None:
+            self.node = 0
         else:
-            return super().make_first_guess()
+            super().update_information(previous_guess)
+            if self.node >= 0:
+                self.node = self.tree.child(self.node, patterns.encode_squares(previous_guess[1]))
+            if self.node < 0:
+                # feedback the tree does not know about, e.g. an answer outside word_list
+                super().update_remaining_words()
+                guess = random.choice(self.remaining_word_list)
+                self.guesses.append(guess)
+                return guess
+
+        guess = self.tree.guess(self.node)
+        self.guesses.append(guess)
+        return guess
 
 class GreedyDepthAlgorithm(BaseAlgorithm):
     '''
     Pick the words by finding the path to minimal depth which basically minimizes the pool
     of possible words as the algorithm gets feedback.
 
+    Searches `depth` guesses ahead and picks the guess that minimizes the expected (or, with
+    objective='worst', the worst-case) number of possible words left at the end. To keep each
+    turn fast:
+    - only the top_k guesses by one-ply score are searched at every node (move ordering),
+    - feedback buckets are searched largest first and a guess is abandoned as soon as its
+      partial cost can no longer beat the best guess found so far (alpha-beta style bound),
+    - once time_budget seconds have passed the search unwinds (every node checks the deadline)
+      and the best guess fully searched so far is returned.
+
     Implemenation is inspired by: https://towardsdatascience.com/automatic-wordle-solving-a305954b746e
     '''
-    def __init__(self, word_list, Verbose=False) -> None:
+    def __init__(self, word_list, depth=2, objective='expected', top_k=8, time_budget=1.0,
+                 full_guesses=False, use_book=True, hard_mode=False, Verbose=False) -> None:
         super().__init__(word_list, Verbose)
+        self.hard_mode = hard_mode
+        if objective not in ['expected', 'worst']:
+            raise ValueError("objective must be 'expected' or 'worst'.")
+        if use_book:
+            self.use_opening_book(objective + '_size', full_guesses)
+        self.depth = depth
+        self.objective = objective
+        self.top_k = top_k
+        self.time_budget = time_budget
+        self.full_guesses = full_guesses
+        # perf_counter time the current search must stop at, None for no limit
+        self.deadline = None
+
+    def out_of_time(self) -> bool:
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    def order_guesses(self, guess_idx, answer_idx) -> np.ndarray:
+        '''
+        Guesses sorted by their one-ply score, best first; ties favour possible answers.
+        The guesses are scored chunk by chunk and any left unscored when the deadline
+        passes go last.
+        '''
+        matrix = self.get_patterns().matrix
+        if self.objective == 'expected':
+            score = patterns.pattern_expected_sizes
+        else:
+            score = patterns.pattern_max_sizes
+        scores = np.full(len(guess_idx), np.inf)
+        chunk = max(1, (1 << 18) // max(len(answer_idx), patterns.DENSE_PATTERNS))
+        for start in range(0, len(guess_idx), chunk):
+            scores[start:start + chunk] = score(matrix, guess_idx[start:start + chunk], answer_idx)
+            if self.out_of_time():
+                break
+        is_answer = np.isin(guess_idx, answer_idx)
+        return guess_idx[np.lexsort((~is_answer, scores))]
 
-    def make_guess(self) -> str:
-        # TO-DO
+    def search(self, answer_idx, depth, bound) -> float:
+        '''
+        Cost of the best guess for these possible answers with depth guesses left,
+        or some value >= bound if no guess can beat bound (or the deadline passed).
+        '''
+        if len(answer_idx) <= 1:
+            return 0
+        if depth == 0:
+            return len(answer_idx)
+        if self.out_of_time():
+            return math.inf
+        best = bound
+        for guess in self.order_guesses(answer_idx, answer_idx)[:self.top_k]:
+            best = min(best, self.guess_cost(guess, answer_idx, depth, best))
+        return best
+
+    def guess_cost(self, guess, answer_idx, depth, bound) -> float:
+        '''
+        Cost of guessing guess then searching each feedback bucket with depth - 1
+        guesses left. Stops early (returning a value >= bound) once bound is reached
+        or the deadline has passed.
+        '''
+        pattern_matrix = self.get_patterns()
+        solved = 3**pattern_matrix.word_length - 1
+        codes = pattern_matrix.matrix[guess][answer_idx]
+        values, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+        cost = 0
+        for b in np.argsort(-counts, kind='stable'):
+            if values[b] == solved:
+                continue
+            if self.out_of_time():
+                return math.inf
+            bucket = answer_idx[inverse == b]
+            if self.objective == 'expected':
+                weight = len(bucket) / len(answer_idx)
+                cost += weight * self.search(bucket, depth - 1, (bound - cost) / weight)
+            else:
+                cost = max(cost, self.search(bucket, depth - 1, bound))
+            if cost >= bound:
+                break
+        return cost
+
+    def make_guess(self, previous_guess=None) -> str:
+        start_time = time.perf_counter()
         # If no previous guesses, make a random guess
         if previous_guess==None:
             return super().make_first_guess()
 
-        return super().make_first_guess()
+        super().update_information(previous_guess)
+        super().update_remaining_words()
+
+        guess = self.book_guess(previous_guess)
+        if guess is not None:
+            self.guesses.append(guess)
+            return guess
+
+        answer_idx = np.flatnonzero(self.get_remaining_mask())
+        guess_idx = np.flatnonzero(self.get_guess_mask()) if self.full_guesses else answer_idx
+        if len(guess_idx) == 0:
+            # the feedback ruled out every word, so there is nothing to search
+            return super().make_first_guess()
+
+        # the whole turn, including ordering the root guesses, counts against the budget
+        if self.time_budget is not None:
+            self.deadline = start_time + self.time_budget
+        candidates = self.order_guesses(guess_idx, answer_idx)[:self.top_k]
+
+        # a search cut short by the deadline costs inf, so it never replaces a finished one
+        best_guess, best_cost = candidates[0], math.inf
+        for guess in candidates:
+            cost = self.guess_cost(guess, answer_idx, self.depth, best_cost)
+            if cost < best_cost:
+                best_guess, best_cost = guess, cost
+            if self.out_of_time():
+                break
+        self.deadline = None
+
+        guess = self.word_list[best_guess]
+        self.guesses.append(guess)
+        return guess
 
 class GreedyBreadthAlgorithm(BaseAlgorithm):
     '''
@@ -484,13 +1228,93 @@ class GreedyBreadthAlgorithm(BaseAlgorithm):
     first search. I imagine this will be optimal since we would stop the search
     once a leaf is found (which provides the shortest branch such that we would
     want to pick the child of the root that brings us there).
+
+    The search is done by iterative deepening: it looks for a guess that solves every
+    possible answer within 2 guesses, then 3, and so on, and stops at the first depth
+    that works, so the guess it returns minimizes the worst-case number of guesses
+    (over the top_k guesses by expected remaining words at every node). What it learns
+    about each set of possible answers is kept in a transposition table (see
+    transposition.py) shared by every game on the same word list, so sets reached
+    through different histories are only solved once.
     '''
-    def __init__(self, word_list, Verbose=False) -> None:
+    def __init__(self, word_list, top_k=10, max_depth=6, table_size=1000000, persist=False,
+                 use_book=True, Verbose=False) -> None:
         super().__init__(word_list, Verbose)
+        if use_book:
+            self.use_opening_book('expected_size')
+        self.top_k = top_k
+        self.max_depth = max_depth
+        self.table = transposition.get_table(word_list, 'breadth_%d' % top_k, table_size, persist)
+
+    def order_guesses(self, answer_idx) -> np.ndarray:
+        matrix = self.get_patterns().matrix
+        scores = patterns.pattern_expected_sizes(matrix, answer_idx, answer_idx)
+        return answer_idx[np.argsort(scores, kind='stable')]
+
+    def solve(self, answer_idx, limit) -> tuple:
+        '''
+        Fewest guesses needed to solve every answer in answer_idx in the worst case, and
+        the guess to make; (math.inf, -1) if it takes more than limit guesses.
+        '''
+        if len(answer_idx) == 1:
+            return 1, int(answer_idx[0])
+        key = transposition.fingerprint(answer_idx)
+        # entries are (depth, guess): solved in depth guesses with guess, or, if guess
+        # is -1, known to need at least depth guesses
+        depth, guess = self.table.get(key, (2, -1))
+        if guess >= 0:
+            return (depth, guess) if depth <= limit else (math.inf, -1)
+        while depth <= limit:
+            guess = self.solve_within(answer_idx, depth)
+            if guess >= 0:
+                self.table.put(key, (depth, guess))
+                return depth, guess
+            depth += 1
+            self.table.put(key, (depth, -1))
+        return math.inf, -1
+
+    def solve_within(self, answer_idx, depth) -> int:
+        '''
+        A guess after which every answer can be solved within depth guesses in total, or -1.
+        '''
+        pattern_matrix = self.get_patterns()
+        solved = 3**pattern_matrix.word_length - 1
+        for guess in self.order_guesses(answer_idx)[:self.top_k]:
+            codes = pattern_matrix.matrix[guess][answer_idx]
+            values, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+            if depth == 2 and counts[values != solved].max(initial=0) > 1:
+                continue
+            for b in np.argsort(-counts, kind='stable'):
+                if values[b] != solved and self.solve(answer_idx[inverse == b], depth - 1)[0] > depth - 1:
+                    break
+            else:
+                return int(guess)
+        return -1
 
-    def make_guess(self) -> str:
-        # TO-DO
-        return super().make_first_guess()
+    def make_guess(self, previous_guess=None) -> str:
+        if previous_guess==None:
+            return super().make_first_guess()
+
+        super().update_information(previous_guess)
+        super().update_remaining_words()
+
+        guess = self.book_guess(previous_guess)
+        if guess is not None:
+            self.guesses.append(guess)
+            return guess
+
+        answer_idx = np.flatnonzero(self.get_remaining_mask())
+        if len(answer_idx) == 0:
+            # the feedback ruled out every word, so there is nothing to solve
+            return super().make_first_guess()
+        depth, guess = self.solve(answer_idx, max(1, self.max_depth - len(self.guesses)))
+        if guess < 0:
+            # cannot be solved in the guesses left; fall back to the best one-ply guess
+            guess = self.order_guesses(answer_idx)[0]
+
+        guess = self.word_list[guess]
+        self.guesses.append(guess)
+        return guess
 
 if __name__=="__main__":
     # manual tests on algorithms
@@ -509,7 +1333,12 @@ if __name__=="__main__":
           \n2.Aggregated Frequency\
           \n3.Entropy Maximization\
           \n4.Genetic Algorithm\
-          \n5.Q-Learning")
+          \n5.Q-Learning\
+          \n6.Decision Tree\
+          \n7.Greedy Depth Search\
+          \n8.Greedy Breadth Search\
+          \n9.Letter Q-Learning\
+          \n10.Lookahead Entropy")
 
     choice = int(input())
     if choice == 1:
@@ -522,6 +1351,16 @@ if __name__=="__main__":
         algo = GeneticAlgortihm(word_list=game.get_word_list())
     elif choice == 5:
         algo = QLearn(word_list=game.get_word_list())
+    elif choice == 6:
+        algo = DecisionTreeAlgorithm(word_list=game.get_word_list())
+    elif choice == 7:
+        algo = GreedyDepthAlgorithm(word_list=game.get_word_list())
+    elif choice == 8:
+        algo = GreedyBreadthAlgorithm(word_list=game.get_word_list())
+    elif choice == 9:
+        algo = LetterQLearn(word_list=game.get_word_list())
+    elif choice == 10:
+        algo = LookaheadEntropyAlgorithm(word_list=game.get_word_list())
 
 
     #print("ANSWER:",game.answer)
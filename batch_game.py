@@ -0,0 +1,234 @@
+'''
+Many Wordle games played in lockstep.
+
+BatchWordleGame holds the state of N games as arrays: the answer of each game
+(as an index into the word list), its turn number and status, and the guesses
+and feedback codes it has seen so far. A turn scores a whole vector of guesses
+against the matching answers with one lookup in the pattern matrix (see
+patterns.py), so simulating thousands of games costs a few array operations per
+turn instead of one interpreter round-trip per guess per game.
+
+BatchAlgorithmAdapter lets the existing algorithms drive a batch. Algorithms
+with a batch_guess method (see BaseAlgorithm.batch_guess) pick the guesses of
+all games in a few array operations per turn; the others play one game at a
+time, so the adapter keeps one copy of the algorithm per game and gathers
+their guesses into a single call to the batch each turn.
+'''
+
+import random
+import time
+import numpy as np
+import patterns
+import word_store
+
+
+class BatchWordleGame:
+    WIN = 1
+    LOSE = -1
+
+    def __init__(self, word_list, answers=None, n_games=1, number_guesses=6, track_candidates=False, seed=None):
+        """
+        Parameters
+        ----------
+        word_list: list
+            Words that can be guessed and that answers are drawn from
+        answers: list, optional
+            Answer of each game, as words or indices into word_list; if None,
+            n_games answers are drawn with random.choice like WordleGame does
+        n_games: int, optional
+            Number of games when answers is None
+        number_guesses: int, optional
+            Max number of times a word can be guessed in each game
+        track_candidates: bool, optional
+            Keep a boolean mask over word_list per game of the answers still
+            consistent with its feedback (N by len(word_list) booleans)
+        seed: int or list of ints, optional
+            Seed of the generator random_candidates draws from
+
+        Returns
+        None
+        -------
+        """
+        self.word_list = word_list
+        self.patterns = patterns.get_pattern_matrix(word_list)
+        self.word_length = self.patterns.word_length
+        self.number_guesses = number_guesses
+        self.solved = 3**self.word_length - 1
+        self.track_candidates = track_candidates
+        self.rng = np.random.default_rng(seed)
+        self.restart(answers, n_games)
+
+    def restart(self, answers=None, n_games=None):
+        '''
+        Start the games over with new answers: the given ones, n_games drawn
+        ones, or the same answers as before if neither is given.
+        '''
+        if answers is None and n_games is not None:
+            answers = [random.choice(self.word_list) for _ in range(n_games)]
+        if answers is not None:
+            self.answers = np.array([self.patterns.index[answer] if isinstance(answer, str) else answer
+                                     for answer in answers], dtype=np.int64)
+        n = len(self.answers)
+        self.turn_number = np.zeros(n, dtype=np.int64)
+        self.game_status = np.zeros(n, dtype=np.int8)
+        # guesses[g, t] is the word index guessed by game g at turn t (-1 if not played)
+        self.guesses = np.full((n, self.number_guesses), -1, dtype=np.int64)
+        self.codes = np.zeros((n, self.number_guesses), dtype=self.patterns.matrix.dtype)
+        self.candidates = np.ones((n, len(self.word_list)), dtype=bool) if self.track_candidates else None
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def active(self) -> np.ndarray:
+        '''
+        Indices of the games still in progress.
+        '''
+        return np.flatnonzero(self.game_status == 0)
+
+    def guess(self, guesses, games=None) -> np.ndarray:
+        '''
+        Make one guess in each of the given games.
+
+        Parameters
+        ----------
+        guesses: array-like
+            Word indices (or words) guessed, one per game
+        games: array-like, optional
+            Games making the guesses; all games in progress if None
+
+        Returns
+        -------
+        codes: np.ndarray
+            Feedback code of each guess (see patterns.py)
+        '''
+        games = self.active() if games is None else np.asarray(games, dtype=np.int64)
+        guesses = np.asarray(guesses)
+        if guesses.dtype.kind not in 'iu':
+            guesses = np.array([self.patterns.index[guess] if isinstance(guess, str) else guess
+                                for guess in guesses], dtype=np.int64)
+        if len(guesses) != len(games):
+            raise ValueError("Expected one guess per game.")
+        if (self.game_status[games] != 0).any():
+            raise ValueError("Cannot guess in a game that is over.")
+
+        codes = self.patterns.matrix[guesses, self.answers[games]]
+        turns = self.turn_number[games]
+        self.guesses[games, turns] = guesses
+        self.codes[games, turns] = codes
+        self.turn_number[games] += 1
+        if self.candidates is not None:
+            self.candidates[games] &= self.patterns.matrix[guesses] == codes[:, None]
+
+        self.game_status[games[self.turn_number[games] >= self.number_guesses]] = self.LOSE
+        self.game_status[games[codes == self.solved]] = self.WIN
+        return codes
+
+    def random_candidates(self, games=None) -> np.ndarray:
+        '''
+        A uniformly random word still consistent with the feedback for each
+        game, picked for all games at once (needs track_candidates).
+        '''
+        games = self.active() if games is None else np.asarray(games, dtype=np.int64)
+        candidates = self.candidates[games]
+        picks = (self.rng.random(len(games)) * candidates.sum(axis=1)).astype(np.int64)
+        # the pick-th consistent word is the first whose running count exceeds pick
+        counts = np.cumsum(candidates, axis=1, dtype=np.uint16 if len(self.word_list) < 2**16 else np.int64)
+        return (counts > picks[:, None]).argmax(axis=1)
+
+    def letters_found(self, game, turns=None) -> tuple:
+        '''
+        Number of positions that got a green square and number of distinct
+        letters that got a green or yellow square in a game, over its first
+        turns guesses (all of them if None).
+        '''
+        greens, letters = set(), set()
+        for guess, squares in self.get_guesses(game)[:turns]:
+            for i, square in enumerate(squares):
+                if square == "GREEN":
+                    greens.add(i)
+                if square != "GREY":
+                    letters.add(guess[i])
+        return len(greens), len(letters)
+
+    def get_game_status(self, game):
+        return int(self.game_status[game])
+
+    def get_last_guess(self, game):
+        '''
+        Most recent guess of a game and its squares, in the same form as
+        WordleGame.get_last_guess; None before the first guess.
+        '''
+        turn = self.turn_number[game]
+        if turn == 0:
+            return None
+        return (self.word_list[self.guesses[game, turn - 1]],
+                patterns.decode_pattern(self.codes[game, turn - 1], self.word_length))
+
+    def get_guesses(self, game):
+        return [[self.word_list[self.guesses[game, t]], patterns.decode_pattern(self.codes[game, t], self.word_length)]
+                for t in range(self.turn_number[game])]
+
+    def get_word_list(self):
+        return self.word_list
+
+
+class BatchAlgorithmAdapter:
+    '''
+    Plays a batch of games with an algorithm. If the algorithm has a
+    batch_guess method it picks the guesses of every game in progress at once
+    (the batch must track candidates). Otherwise each game gets its own copy
+    (see BaseAlgorithm.fork) of the algorithm, which is asked for its guess.
+    The guesses are scored together either way.
+    '''
+    def __init__(self, algorithm, batch) -> None:
+        self.batch = batch
+        self.algorithm = algorithm
+        self.algorithms = []
+        if algorithm.plays_batches:
+            if batch.candidates is None:
+                raise ValueError("%s needs a batch with track_candidates=True." % type(algorithm).__name__)
+        else:
+            for _ in range(len(batch)):
+                algo = algorithm.fork()
+                algo.reset()
+                self.algorithms.append(algo)
+        # time spent picking each game's guesses; a batched turn is split evenly over its games
+        self.times = np.zeros(len(batch))
+
+    def step(self) -> np.ndarray:
+        '''
+        Play one turn of every game in progress; returns the feedback codes.
+        '''
+        games = self.batch.active()
+        if self.algorithm.plays_batches:
+            start_time = time.perf_counter()
+            guesses = self.algorithm.batch_guess(self.batch, games)
+            self.times[games] += (time.perf_counter() - start_time) / len(games)
+            return self.batch.guess(guesses, games)
+        guesses = []
+        for game in games:
+            start_time = time.perf_counter()
+            guesses.append(self.algorithms[game].make_guess(self.batch.get_last_guess(game)))
+            self.times[game] += time.perf_counter() - start_time
+        return self.batch.guess(guesses, games)
+
+    def play(self) -> np.ndarray:
+        '''
+        Play every game to the end; returns the game statuses.
+        '''
+        while len(self.batch.active()):
+            self.step()
+        return self.batch.game_status
+
+
+if __name__ == "__main__":
+    # simulate games of a player guessing random consistent words
+    random.seed(0)
+    word_list = word_store.get_word_store().word_list
+    start_time = time.perf_counter()
+    batch = BatchWordleGame(word_list, n_games=10000, track_candidates=True, seed=0)
+    while len(batch.active()):
+        batch.guess(batch.random_candidates())
+    elapsed = time.perf_counter() - start_time
+    print('Played %d games in %.2f s (%.0f games/sec), win rate %.3f'
+          % (len(batch), elapsed, len(batch) / elapsed, (batch.game_status == batch.WIN).mean()))
@@ -0,0 +1,108 @@
+'''
+Files derived from a word list and cached on disk.
+
+Pattern matrices, decision trees, opening books, transposition tables and
+policies are all computed from a word list and saved in the word_lists folder
+under a name holding a hash of the list. This module has the pieces they
+share: the file names, writing through a temporary file renamed into place
+(so concurrent processes never see a partial file), version and word list
+checks on load, and a per-process cache so each file is loaded only once.
+'''
+
+import contextlib
+import hashlib
+import os
+import numpy as np
+
+CACHE_DIR = 'word_lists'
+
+_loaded = {}
+
+
+def word_list_hash(word_list) -> str:
+    '''
+    Hash of the contents (and order) of a word list, used to key cache files.
+    '''
+    return hashlib.sha1('\n'.join(word_list).encode()).hexdigest()[:16]
+
+
+def cache_path(prefix, word_list, *parts, ext='.npz', cache_dir=CACHE_DIR) -> str:
+    '''
+    File named prefix_<word list hash>_<parts...> in cache_dir; empty parts are left out.
+    '''
+    name = '_'.join([prefix, word_list_hash(word_list)] + [str(part) for part in parts if part])
+    return os.path.join(cache_dir, name + ext)
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='wb'):
+    '''
+    Open a temporary file next to path for writing and move it to path once
+    the block has finished without error.
+    '''
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_arrays(path, word_list, version, **arrays) -> None:
+    '''
+    Save arrays as an .npz file stamped with a format version and the hash of word_list.
+    '''
+    with atomic_write(path) as f:
+        np.savez(f, version=version, word_list_hash=word_list_hash(word_list), **arrays)
+
+
+def load_arrays(path, word_list, version):
+    '''
+    Load an .npz file written by save_arrays, checking its version and word list.
+    '''
+    data = np.load(path)
+    if int(data['version']) != version or str(data['word_list_hash']) != word_list_hash(word_list):
+        raise ValueError("%s was built for a different word list or format." % path)
+    return data
+
+
+def is_cached(path) -> bool:
+    '''
+    Whether the object at path is loaded in this process or saved on disk.
+    '''
+    return path in _loaded or os.path.exists(path)
+
+
+def get_cached(path, load, build, save=None):
+    '''
+    Get the object cached at path, loading it only once per process.
+
+    Parameters
+    ----------
+    path: str
+        File the object is saved to
+    load: callable
+        load(path) reads the object from the file
+    build: callable
+        build() computes the object if the file does not exist
+    save: callable, optional
+        save(obj, path) writes a newly built object to the file
+
+    Returns
+    -------
+    obj: object
+    '''
+    if path not in _loaded:
+        if os.path.exists(path):
+            obj = load(path)
+        else:
+            obj = build()
+            if save is not None:
+                save(obj, path)
+        _loaded[path] = obj
+    return _loaded[path]
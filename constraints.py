@@ -0,0 +1,85 @@
+'''
+What the feedback so far says about the answer.
+
+Constraints keeps everything the squares reveal: the letter locked in by a
+green square at each position, the letters ruled out at each position (yellow
+and grey squares), the minimum number of copies of each letter (its green and
+yellow squares in one guess) and, once a letter also gets a grey square, its
+exact number of copies. narrow applies the ones added since it was last
+called to a boolean mask over a word list, with a few vectorized operations on
+its WordIndex (see word_index.py).
+'''
+
+import collections
+import copy
+import numpy as np
+
+
+class Constraints:
+    def __init__(self, word_length) -> None:
+        self.word_length = word_length
+        # green[pos]: letter the answer has at pos
+        self.green = {}
+        # excluded[pos]: letters the answer does not have at pos
+        self.excluded = [set() for _ in range(word_length)]
+        # min_count[letter] <= copies of letter in the answer <= max_count[letter]
+        self.min_count = {}
+        self.max_count = {}
+        # constraints added since the last call to narrow
+        self.pending = []
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def update(self, guess, squares) -> None:
+        '''
+        Add the feedback squares ("GREEN", "YELLOW" or "GREY") to guess.
+        '''
+        found = collections.Counter(letter for letter, square in zip(guess, squares) if square != "GREY")
+        for i, (letter, square) in enumerate(zip(guess, squares)):
+            if square == "GREEN":
+                if self.green.get(i) != letter:
+                    self.green[i] = letter
+                    self.pending.append(('green', i, letter))
+            elif letter not in self.excluded[i]:
+                self.excluded[i].add(letter)
+                self.pending.append(('excluded', i, letter))
+            if square == "GREY" and letter not in self.max_count:
+                # every copy of the letter the answer has got a coloured square
+                self.max_count[letter] = found[letter]
+                self.pending.append(('max', letter, found[letter]))
+        for letter, count in found.items():
+            if count > self.min_count.get(letter, 0):
+                self.min_count[letter] = count
+                self.pending.append(('min', letter, count))
+
+    def narrow(self, index, mask) -> np.ndarray:
+        '''
+        Narrow a mask that already satisfies the constraints as of the last
+        call by the constraints added since.
+        '''
+        mask = mask.copy()
+        for kind, key, value in self.pending:
+            if kind == 'green':
+                mask &= index.with_letter_at(key, value)
+            elif kind == 'excluded':
+                if self.max_count.get(value) != 0:
+                    mask &= ~index.with_letter_at(key, value)
+            elif kind == 'min':
+                mask &= index.with_letter_count(key, at_least=value)
+            else:
+                mask &= index.with_letter_count(key, at_most=value)
+        self.pending = []
+        return mask
+
+    def hard_mode_mask(self, index) -> np.ndarray:
+        '''
+        Boolean mask over the words of index allowed as a guess in hard mode:
+        green letters stay in place and revealed letters are used again.
+        '''
+        mask = index.all_words()
+        for i, letter in self.green.items():
+            mask &= index.with_letter_at(i, letter)
+        for letter, count in self.min_count.items():
+            mask &= index.with_letter_count(letter, at_least=count)
+        return mask
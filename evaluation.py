@@ -5,11 +5,551 @@ from itertools import product
 import string
 import copy
 import time
+import sys
+import argparse
+import math
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
 from IPython.display import clear_output
+import numpy as np
 import pandas as pd
+from batch_game import BatchWordleGame, BatchAlgorithmAdapter
+import patterns
+import word_store
+import profiling
 
-if __name__=="__main__":
-    # Get required evaluation test Information
+ALGORITHMS = {
+    1: ('Human Algorithm', HumanAlgorithm),
+    2: ('Naive Frequency Algorithm', NaiveFrequencyAlgorithm),
+    3: ('Max Entropy Algorithm', MaxEntropyAlgorithm),
+    4: ('Genetic Algorithm', GeneticAlgortihm),
+    5: ('Q Learning', QLearn),
+    6: ('Decision Tree Algorithm', DecisionTreeAlgorithm),
+    7: ('Greedy Depth Algorithm', GreedyDepthAlgorithm),
+    8: ('Greedy Breadth Algorithm', GreedyBreadthAlgorithm),
+    9: ('Letter Q Learning', LetterQLearn),
+    10: ('Lookahead Entropy Algorithm', LookaheadEntropyAlgorithm),
+}
+
+# Settings the algorithms are evaluated with. Wall-clock time budgets would make
+# the guesses depend on machine load and the number of workers, so the searches
+# run to completion instead.
+ALGORITHM_OPTIONS = {
+    7: {'time_budget': None},
+    10: {'time_budget': None},
+}
+
+# Trials are split into shards of this size; the split does not depend on the
+# number of workers so results are the same for any worker count.
+SHARD_SIZE = 10
+
+
+def new_metrics() -> dict:
+    return {'Trials' : 0, 'Wins' : 0, 'Perfect Letter Count' : 0, 'Correct Letter Count' : 0,
+        'Num Guesses' : 0, 'Win Num Guesses' : 0, 'Sum Squared Guesses' : 0, 'Times' : []}
+
+
+def merge_metrics(metrics, other) -> dict:
+    '''
+    Add the per-algorithm metrics of other into metrics.
+    '''
+    for algo_name, values in other.items():
+        if algo_name not in metrics.keys():
+            metrics[algo_name] = new_metrics()
+        for key, value in values.items():
+            metrics[algo_name][key] += value
+    return metrics
+
+
+def play_game(test_game, test_algo, algo_metrics, word_length, number_guesses, algo_name=None, trial=None):
+    '''
+    Let an algorithm play a game to the end and record how it did. If
+    profiling is enabled, every turn is also recorded (see profiling.py)
+    under algo_name and trial.
+    '''
+    algo_metrics['Trials'] += 1
+    start_time = time.perf_counter()
+    game_status = test_game.get_game_status()
+    while game_status==0:
+        recorder = profiling.recorder
+        if recorder is None:
+            test_game.guess(test_algo.make_guess(test_game.get_last_guess()))
+        else:
+            recorder.start_turn()
+            turn_start = time.perf_counter()
+            last_guess = test_game.get_last_guess()
+            guess_start = time.perf_counter()
+            guess = test_algo.make_guess(last_guess)
+            guess_end = time.perf_counter()
+            test_game.guess(guess)
+            turn_end = time.perf_counter()
+            recorder.record(algo_name, trial, test_game.turn_number, len(test_algo.remaining_word_list),
+                            guess_end - guess_start, (guess_start - turn_start) + (turn_end - guess_end))
+        game_status = test_game.get_game_status()
+
+        if game_status==0 and test_game.get_last_guess():
+            continue
+        elif game_status==1:
+            end_time = time.perf_counter()
+            algo_metrics['Wins'] += 1
+            algo_metrics['Perfect Letter Count'] += word_length
+            algo_metrics['Correct Letter Count'] += word_length
+            algo_metrics['Num Guesses'] += len(test_algo.guesses)
+            algo_metrics['Win Num Guesses'] += len(test_algo.guesses)
+            algo_metrics['Sum Squared Guesses'] += len(test_algo.guesses)**2
+            algo_metrics['Times'].append(end_time - start_time)
+            break
+        elif game_status==-1:
+            end_time = time.perf_counter()
+            algo_metrics['Perfect Letter Count'] += len(test_algo.right_position)
+            algo_metrics['Correct Letter Count'] += len(set(test_algo.good_letters))
+            algo_metrics['Num Guesses'] += number_guesses
+            algo_metrics['Sum Squared Guesses'] += number_guesses**2
+            algo_metrics['Times'].append(end_time - start_time)
+            break
+
+
+def new_algorithm(alg, word_list):
+    '''
+    Algorithm number alg from ALGORITHMS, set up for evaluation.
+    '''
+    return ALGORITHMS[alg][1](word_list=word_list, **ALGORITHM_OPTIONS.get(alg, {}))
+
+
+def new_game(word_length=5, number_guesses=6, word_file=None) -> WordleGame:
+    '''
+    A game on the default word list, or on the words of word_length in
+    word_file (a dictionary with words of any lengths) if given.
+    '''
+    if word_file is None:
+        return WordleGame(word_length = word_length, number_guesses = number_guesses)
+    return WordleGame(word_length = word_length, word_source = 'web_simple', number_guesses = number_guesses,
+                      web_source = word_file)
+
+
+def load_words(word_length=5, word_file=None) -> None:
+    '''
+    Load the word list in this process, so worker processes forked after it
+    share it.
+    '''
+    if word_file is None:
+        word_store.get_word_store(word_length=word_length, persist=True)
+    else:
+        word_store.get_length_stores(word_file)
+
+
+def run_trials(algos, trial_ids, word_length=5, number_guesses=6, seed=0, verbose=False, word_file=None) -> dict:
+    '''
+    Play the given trials with every algorithm.
+
+    Parameters
+    ----------
+    algos: list
+        Algorithm numbers from ALGORITHMS
+    trial_ids: iterable
+        Trial numbers to play; each trial is seeded from (seed, trial number)
+        and each algorithm's game from (seed, trial number, algorithm)
+    word_length: int, optional
+        Length of word to guess
+    number_guesses: int, optional
+        Max number of times a word can be guessed
+    seed: int, optional
+        Base random seed
+    verbose: bool, optional
+        Print progress every 10 trials
+    word_file: str, optional
+        Dictionary file to take the words of word_length from instead of the
+        default word list
+
+    Returns
+    -------
+    metrics: dict
+        Per-algorithm counts, keyed by algorithm name
+    '''
+    metrics = {}
+    for i in trial_ids:
+        random.seed('%d-%d' % (seed, i))
+        game = new_game(word_length, number_guesses, word_file)
+
+        for alg in algos:
+            # seed per algorithm so results do not depend on which others run
+            random.seed('%d-%d-%d' % (seed, i, alg))
+            test_game = copy.deepcopy(game) # Preserve answer
+            test_algo_name = ALGORITHMS[alg][0]
+            test_algo = new_algorithm(alg, test_game.get_word_list())
+
+            if test_algo_name not in metrics.keys():
+                metrics[test_algo_name] = new_metrics()
+
+            play_game(test_game, test_algo, metrics[test_algo_name], word_length, number_guesses,
+                      test_algo_name, i)
+
+        if verbose and i % 10 == 0:
+            clear_output(wait=True)
+            print(f"Episode: {i}")
+    return metrics
+
+
+def _run_shard(args) -> dict:
+    algos, trial_ids, word_length, number_guesses, seed, word_file = args
+    return run_trials(algos, trial_ids, word_length, number_guesses, seed, word_file=word_file)
+
+
+def evaluate(algos, trials=100, word_length=5, number_guesses=6, workers=1, seed=0, word_file=None) -> dict:
+    '''
+    Play trials with every algorithm, sharding them across worker processes.
+
+    Results only depend on the seed, not on the number of workers (except for
+    the run times).
+
+    Returns
+    -------
+    metrics: dict
+        Per-algorithm counts, keyed by algorithm name
+    '''
+    if workers <= 1:
+        return run_trials(algos, range(trials), word_length, number_guesses, seed, verbose=True,
+                          word_file=word_file)
+
+    shards = [(algos, range(start, min(start + SHARD_SIZE, trials)), word_length, number_guesses, seed, word_file)
+              for start in range(0, trials, SHARD_SIZE)]
+    metrics = {}
+    # load the word list before forking so every worker shares this copy
+    load_words(word_length, word_file)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map returns in shard order, so merging is deterministic
+        for n, shard_metrics in enumerate(executor.map(_run_shard, shards)):
+            merge_metrics(metrics, shard_metrics)
+            print(f"Shards complete: {n + 1}/{len(shards)}")
+    return metrics
+
+
+def batch_evaluate(algos, trials=100, word_length=5, number_guesses=6, seed=0, word_file=None) -> dict:
+    '''
+    Play all trials of each algorithm at once on a BatchWordleGame.
+
+    The answers are the same as evaluate draws for the same seed, but the
+    games advance in lockstep, so algorithms that use randomness after the
+    first guess can get different results than with evaluate. Algorithms
+    with a batch_guess method pick the guesses of all games at once; the
+    others are run one copy per game.
+
+    Returns
+    -------
+    metrics: dict
+        Per-algorithm counts, keyed by algorithm name
+    '''
+    word_list = new_game(word_length, number_guesses, word_file).get_word_list()
+    answers = []
+    for i in range(trials):
+        # the same draw WordleGame makes for trial i in run_trials
+        random.seed('%d-%d' % (seed, i))
+        answers.append(random.choice(word_list))
+
+    metrics = {}
+    for alg in algos:
+        random.seed('%d-batch-%d' % (seed, alg))
+        algo_name = ALGORITHMS[alg][0]
+        algo = new_algorithm(alg, word_list)
+        batch = BatchWordleGame(word_list, answers, number_guesses=number_guesses,
+                                track_candidates=algo.plays_batches, seed=[seed, alg])
+        adapter = BatchAlgorithmAdapter(algo, batch)
+        adapter.play()
+
+        algo_metrics = metrics.setdefault(algo_name, new_metrics())
+        for game in range(len(batch)):
+            turns = int(batch.turn_number[game])
+            algo_metrics['Trials'] += 1
+            algo_metrics['Num Guesses'] += turns
+            algo_metrics['Sum Squared Guesses'] += turns**2
+            algo_metrics['Times'].append(adapter.times[game])
+            if batch.game_status[game] == batch.WIN:
+                algo_metrics['Wins'] += 1
+                algo_metrics['Perfect Letter Count'] += word_length
+                algo_metrics['Correct Letter Count'] += word_length
+                algo_metrics['Win Num Guesses'] += turns
+            else:
+                # the feedback the algorithm got to see, as play_game counts it
+                perfect, correct = batch.letters_found(game, turns - 1)
+                algo_metrics['Perfect Letter Count'] += perfect
+                algo_metrics['Correct Letter Count'] += correct
+        print(f"{algo_name} complete")
+    return metrics
+
+
+def interval_widths(algo_values, confidence=0.95) -> tuple:
+    '''
+    Widths of the confidence intervals on win rate (Wilson score interval)
+    and on the mean number of guesses (normal approximation).
+    '''
+    n = algo_values['Trials']
+    if n < 2:
+        return math.inf, math.inf
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = algo_values['Wins'] / n
+    win_width = 2 * z * math.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+    mean = algo_values['Num Guesses'] / n
+    variance = max(0, algo_values['Sum Squared Guesses'] - n * mean**2) / (n - 1)
+    guesses_width = 2 * z * math.sqrt(variance / n)
+    return win_width, guesses_width
+
+
+def significantly_different(values_a, values_b, alpha) -> bool:
+    '''
+    Two-sided z-tests on win rate and mean number of guesses; True if either
+    difference is significant at level alpha.
+    '''
+    n_a, n_b = values_a['Trials'], values_b['Trials']
+    if n_a < 2 or n_b < 2:
+        return False
+    z_crit = NormalDist().inv_cdf(1 - alpha / 2)
+
+    p_a, p_b = values_a['Wins'] / n_a, values_b['Wins'] / n_b
+    p = (values_a['Wins'] + values_b['Wins']) / (n_a + n_b)
+    se = math.sqrt(p * (1 - p) * (1 / n_a + 1 / n_b))
+    if se > 0 and abs(p_a - p_b) / se > z_crit:
+        return True
+
+    means, variances = [], []
+    for values, n in ((values_a, n_a), (values_b, n_b)):
+        mean = values['Num Guesses'] / n
+        means.append(mean)
+        variances.append(max(0, values['Sum Squared Guesses'] - n * mean**2) / (n - 1) / n)
+    se = math.sqrt(sum(variances))
+    return se > 0 and abs(means[0] - means[1]) / se > z_crit
+
+
+def sequential_evaluate(algos, word_length=5, number_guesses=6, workers=1, seed=0, confidence=0.95,
+                        win_rate_width=0.05, guesses_width=0.2, min_trials=30, max_trials=5000,
+                        word_file=None) -> dict:
+    '''
+    Keep playing trials until the results are precise enough.
+
+    Trials are played in batches. After each batch an algorithm stops once
+    both of its confidence intervals are narrower than the targets, or once it
+    is significantly different from every other algorithm, since further
+    trials would not change the comparison. Every algorithm stops at
+    max_trials.
+
+    The tests are repeated after every batch, so their level is corrected for
+    the repeated looks as well as for the pairs of algorithms: alpha is spent
+    linearly over the trials, each look testing at alpha * batch size /
+    max_trials (Bonferroni over the at most max_trials / batch size looks).
+    The chance of wrongly calling any pair different is then at most
+    1 - confidence. The width rule only decides when the estimates are
+    precise enough; the intervals of an algorithm stopped by it are not
+    corrected for the looks and their coverage is approximate.
+
+    Parameters
+    ----------
+    algos: list
+        Algorithm numbers from ALGORITHMS
+    confidence: float, optional
+        Confidence level of the intervals and tests
+    win_rate_width: float, optional
+        Target width of the win rate confidence interval
+    guesses_width: float, optional
+        Target width of the mean number of guesses confidence interval
+    min_trials: int, optional
+        Trials played by every algorithm before it can stop
+    max_trials: int, optional
+        Trials after which an algorithm stops regardless
+
+    Returns
+    -------
+    metrics: dict
+        Per-algorithm counts, keyed by algorithm name; 'Trials' holds the
+        number of trials each algorithm needed
+    '''
+    alpha = 1 - confidence
+    if len(algos) > 1:
+        alpha /= len(algos) * (len(algos) - 1) / 2
+    batch_size = SHARD_SIZE * max(1, workers)
+    # alpha spent at each look
+    alpha *= min(1, batch_size / max_trials)
+    load_words(word_length, word_file)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    metrics = {}
+    active = list(algos)
+    next_trial = 0
+    try:
+        while active:
+            trial_ids = range(next_trial, next_trial + batch_size)
+            next_trial += batch_size
+            if executor is None:
+                merge_metrics(metrics, run_trials(active, trial_ids, word_length, number_guesses, seed,
+                                                  word_file=word_file))
+            else:
+                shards = [(active, range(start, min(start + SHARD_SIZE, trial_ids.stop)), word_length,
+                           number_guesses, seed, word_file)
+                          for start in range(trial_ids.start, trial_ids.stop, SHARD_SIZE)]
+                for shard_metrics in executor.map(_run_shard, shards):
+                    merge_metrics(metrics, shard_metrics)
+
+            still_active = []
+            for alg in active:
+                algo_values = metrics[ALGORITHMS[alg][0]]
+                if algo_values['Trials'] >= max_trials:
+                    continue
+                if algo_values['Trials'] < min_trials:
+                    still_active.append(alg)
+                    continue
+                win_width, mean_width = interval_widths(algo_values, confidence)
+                if win_width <= win_rate_width and mean_width <= guesses_width:
+                    continue
+                others = [values for name, values in metrics.items() if name != ALGORITHMS[alg][0]]
+                if others and all(significantly_different(algo_values, values, alpha) for values in others):
+                    continue
+                still_active.append(alg)
+            active = still_active
+            print('Trials played: ' + ', '.join('{} {}'.format(name, values['Trials'])
+                                                for name, values in metrics.items()))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return metrics
+
+
+def exhaustive_evaluation(alg, word_list, number_guesses=6, first_guess=None, seed=0) -> dict:
+    '''
+    Play every word in word_list as the answer by walking the feedback tree.
+
+    Games that get the same feedback make the same decisions, so instead of
+    replaying each game from scratch the answers are split by the feedback to
+    each guess and the algorithm only decides once per bucket. This gives the
+    exact results only for deterministic algorithms (the first guess is fixed).
+
+    Parameters
+    ----------
+    alg: int
+        Algorithm number from ALGORITHMS
+    word_list: list
+        Word list; every word is used as an answer once
+    number_guesses: int, optional
+        Max number of times a word can be guessed
+    first_guess: str, optional
+        Opening guess; drawn with the algorithm's own first guess if None
+    seed: int, optional
+        Random seed used for the first guess
+
+    Returns
+    -------
+    result: dict
+        'Distribution' maps number of guesses to the number of answers solved
+        in that many guesses, 'Failed' the answers not solved and 'Decisions'
+        the number of make_guess calls made
+    '''
+    algo = new_algorithm(alg, word_list)
+    pattern_matrix = algo.get_patterns()
+    solved = pattern_matrix.matrix.dtype.type(3**pattern_matrix.word_length - 1)
+    result = {'Distribution' : {n : 0 for n in range(1, number_guesses + 1)}, 'Failed' : 0, 'Decisions' : 0}
+
+    def walk(algo, previous_guess, answers, turn):
+        if previous_guess is None and first_guess is not None:
+            guess = first_guess
+            if isinstance(algo.guesses, dict):
+                algo.guesses[guess] = None
+            else:
+                algo.guesses.append(guess)
+        else:
+            guess = algo.make_guess(previous_guess)
+        result['Decisions'] += 1
+        codes = pattern_matrix.row(guess)[answers]
+        for code in np.unique(codes):
+            bucket = answers[codes == code]
+            if code == solved:
+                result['Distribution'][turn] += len(bucket)
+            elif turn == number_guesses:
+                result['Failed'] += len(bucket)
+            else:
+                squares = patterns.decode_pattern(code, pattern_matrix.word_length)
+                walk(algo.fork(), (guess, squares), bucket, turn + 1)
+
+    random.seed(seed)
+    walk(algo, None, np.arange(len(word_list)), 1)
+    return result
+
+
+def summarize_exhaustive(results, verbose=True) -> dict:
+    '''
+    Turn the exhaustive results per algorithm into rows for the output csv.
+    '''
+    number_guesses = max(len(result['Distribution']) for result in results.values())
+    output_data = {'Algo Name' : [], 'Average Win Rate' : [], 'Average Number of Guesses to Win' : []}
+    for n in range(1, number_guesses + 1):
+        output_data['Solved in %d' % n] = []
+    output_data['Failed'] = []
+    output_data['Decisions'] = []
+
+    for algo, result in results.items():
+        distribution = result['Distribution']
+        wins = sum(distribution.values())
+        output_data['Algo Name'].append(algo)
+        output_data['Average Win Rate'].append(wins / (wins + result['Failed']))
+        if wins > 0:
+            output_data['Average Number of Guesses to Win'].append(sum(n * c for n, c in distribution.items()) / wins)
+        else:
+            output_data['Average Number of Guesses to Win'].append(float('nan'))
+        for n in range(1, number_guesses + 1):
+            output_data['Solved in %d' % n].append(distribution.get(n, 0))
+        output_data['Failed'].append(result['Failed'])
+        output_data['Decisions'].append(result['Decisions'])
+
+        if verbose:
+            print('Guesses to solve for {}: '.format(algo),
+                  ', '.join('%d: %d' % (n, c) for n, c in distribution.items()), ', failed:', result['Failed'])
+            print('Average win rate for {} was: '.format(algo), output_data['Average Win Rate'][-1])
+            print('Average number of guesses to win for {} was: '.format(algo), output_data['Average Number of Guesses to Win'][-1])
+            print()
+
+    return output_data
+
+
+def summarize(metrics, word_length, verbose=True, include_trials=False) -> dict:
+    '''
+    Turn the per-algorithm counts into the averages written to the output csv.
+    '''
+    output_data = {'Algo Name' : [], 'Average Win Rate' : [], 'Letter Accuracy' : [], 'Perfect Letter Accuracy' : [],
+        'Average Number of Guesses' : [], 'Average Number of Guesses to Win' : [], 'Average Run Time' : []}
+
+    for i in range(len(metrics)):
+        algo = list(metrics.keys())[i]
+        algo_values = metrics[algo]
+        trials = algo_values['Trials']
+
+        output_data['Algo Name'].append(algo)
+        output_data['Average Win Rate'].append(algo_values['Wins']/trials)
+        output_data['Letter Accuracy'].append(algo_values['Correct Letter Count'] / (trials * word_length))
+        output_data['Perfect Letter Accuracy'].append(algo_values['Perfect Letter Count'] / (trials * word_length))
+        output_data['Average Number of Guesses'].append(algo_values['Num Guesses'] / trials)
+        if algo_values['Wins'] > 0:
+            output_data['Average Number of Guesses to Win'].append(algo_values['Win Num Guesses'] / algo_values['Wins'])
+        else:
+            output_data['Average Number of Guesses to Win'].append(float('nan'))
+        output_data['Average Run Time'].append(sum(algo_values['Times']) / trials)
+
+        if verbose:
+            print('Average win rate for {} was: '.format(algo), output_data['Average Win Rate'][-1])
+            print('Letter accuracy for {} was: '.format(algo), output_data['Letter Accuracy'][-1])
+            print('Perfect letter accuracy for {} was: '.format(algo), output_data['Perfect Letter Accuracy'][-1])
+            print('Average number of guesses for {} was: '.format(algo), output_data['Average Number of Guesses'][-1])
+            print('Average number of guesses to win for {} was: '.format(algo), output_data['Average Number of Guesses to Win'][-1])
+            print('Average run time for {} was: '.format(algo), output_data['Average Run Time'][-1])
+            print()
+
+    if include_trials:
+        output_data['Trials'] = [metrics[algo]['Trials'] for algo in metrics]
+        for algo, trials in zip(output_data['Algo Name'], output_data['Trials']):
+            print('Trials needed for {}: '.format(algo), trials)
+
+    return output_data
+
+
+def prompt_arguments() -> argparse.Namespace:
+    '''
+    Ask for the evaluation settings interactively.
+    '''
     # First pick algorithms to test
     print("\nWhat algorithm(s) do you want to test?")
     print("If you want multiple, input all corresponding numbers with spaces seperating them.\
@@ -19,7 +559,12 @@ if __name__=="__main__":
         \n2.Aggregated Frequency\
         \n3.Entropy Maximization\
         \n4.Genetic Algorithm\
-        \n5.Q-Learning")
+        \n5.Q-Learning\
+        \n6.Decision Tree\
+        \n7.Greedy Depth Search\
+        \n8.Greedy Breadth Search\
+        \n9.Letter Q-Learning\
+        \n10.Lookahead Entropy")
     algos = str(input()).split()
     algos = [int(i) for i in algos]
 
@@ -37,91 +582,110 @@ if __name__=="__main__":
     if number_guesses == '': number_guesses = 6
     else: number_guesses = int(number_guesses)
 
-    # Loop through n number of times and get performance metrics
-    # Calculate win rate, perfect letter accuracy (how many correct letters in correct spots),
-    # letter accuracy (how many correct letter), average number of guesses,
-    # average number of guesses to win, and time. Subject to change.
-    metrics = {}
-    for i in range(trials):
-        # Defaul params = word_length=5, word_source="default", word_list=None, number_guesses=6
-        game = WordleGame(word_length = word_length, number_guesses = number_guesses)
-
-        for alg in algos:
-            test_game = copy.deepcopy(game) # Preserve answer
+    return argparse.Namespace(algorithms=algos, trials=trials, word_length=word_length,
+                              number_guesses=number_guesses, workers=1, seed=0,
+                              output='outputs/full_evaluation_out.csv', exhaustive=False,
+                              sequential=False, batch=False, profile_turns=None, cprofile=False,
+                              word_file=None)
 
-            if alg == 1:
-                test_algo = HumanAlgorithm(word_list=test_game.get_word_list())
-                test_algo_name = 'Human Algorithm'
-            elif alg == 2:
-                test_algo = NaiveFrequencyAlgorithm(word_list=test_game.get_word_list())
-                test_algo_name = 'Naive Frequency Algorithm'
-            elif alg == 3:
-                test_algo = MaxEntropyAlgorithm(word_list=test_game.get_word_list())
-                test_algo_name = 'Max Entropy Algorithm'
-            elif alg == 4:
-                test_algo = GeneticAlgortihm(word_list=test_game.get_word_list())
-                test_algo_name = 'Genetic Algorithm'
-            elif alg == 5:
-                test_algo = QLearn(word_list=test_game.get_word_list())
-                test_algo_name = 'Q Learning'
 
-            if test_algo_name not in metrics.keys():
-                metrics[test_algo_name] = {'Wins' : 0, 'Perfect Letter Count' : 0, 'Correct Letter Count' : 0,
-                    'Num Guesses' : 0, 'Win Num Guesses' : 0, 'Times' : []}
+def parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Evaluate Wordle algorithms.")
+    parser.add_argument('-a', '--algorithms', type=int, nargs='+', required=True, choices=sorted(ALGORITHMS),
+                        help='algorithm numbers: 1 Human, 2 Aggregated Frequency, 3 Entropy Maximization, '
+                             '4 Genetic, 5 Q-Learning, 6 Decision Tree, 7 Greedy Depth Search, '
+                             '8 Greedy Breadth Search, 9 Letter Q-Learning, 10 Lookahead Entropy')
+    parser.add_argument('-t', '--trials', type=int, default=100, help='number of trials (default 100)')
+    parser.add_argument('-l', '--word-length', type=int, default=5, help='word length (default 5)')
+    parser.add_argument('--word-file', default=None,
+                        help='dictionary file (words of any lengths) to take the words of --word-length from '
+                             'instead of the default list')
+    parser.add_argument('-g', '--number-guesses', type=int, default=6, help='number of guesses (default 6)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='worker processes (default 1)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='random seed (default 0)')
+    parser.add_argument('-o', '--output', default=None, help='output csv file')
+    parser.add_argument('--profile-turns', default=None,
+                        help='record every turn (candidates left and filtering, scoring and game time) '
+                             'to this .jsonl or .csv file; runs in one process')
+    parser.add_argument('--cprofile', action='store_true', help='also run cProfile and print the top functions')
+    parser.add_argument('--batch', action='store_true',
+                        help='play all trials of an algorithm in lockstep on one batched game')
+    parser.add_argument('--exhaustive', action='store_true',
+                        help='play every word as the answer once by walking the feedback tree '
+                             '(for deterministic algorithms)')
+    parser.add_argument('--first-guess', default=None, help='fixed first guess for --exhaustive')
+    parser.add_argument('--sequential', action='store_true',
+                        help='play trials until the confidence intervals are narrow enough or the '
+                             'algorithms are significantly different, instead of a fixed number')
+    parser.add_argument('--confidence', type=float, default=0.95, help='confidence level for --sequential')
+    parser.add_argument('--win-rate-width', type=float, default=0.05,
+                        help='target win rate interval width for --sequential (default 0.05)')
+    parser.add_argument('--guesses-width', type=float, default=0.2,
+                        help='target mean guesses interval width for --sequential (default 0.2)')
+    parser.add_argument('--min-trials', type=int, default=30, help='minimum trials for --sequential')
+    parser.add_argument('--max-trials', type=int, default=5000, help='maximum trials for --sequential')
+    args = parser.parse_args(argv)
+    if args.output is None:
+        if args.exhaustive:
+            args.output = 'outputs/exhaustive_evaluation_out.csv'
+        else:
+            args.output = 'outputs/full_evaluation_out.csv'
+    return args
 
-            start_time = time.perf_counter()
-            game_status = test_game.get_game_status()
-            while game_status==0:
-                test_game.guess(test_algo.make_guess(test_game.get_last_guess()))
-                game_status = test_game.get_game_status()
 
-                if game_status==0 and test_game.get_last_guess():
-                    continue
-                elif game_status==1:
-                    end_time = time.perf_counter()
-                    metrics[test_algo_name]['Wins'] += 1
-                    metrics[test_algo_name]['Perfect Letter Count'] += word_length
-                    metrics[test_algo_name]['Correct Letter Count'] += word_length
-                    metrics[test_algo_name]['Num Guesses'] += len(test_algo.guesses)
-                    metrics[test_algo_name]['Win Num Guesses'] += len(test_algo.guesses)
-                    metrics[test_algo_name]['Times'].append(end_time - start_time)
-                    break
-                elif game_status==-1:
-                    end_time = time.perf_counter()
-                    metrics[test_algo_name]['Perfect Letter Count'] += len(test_algo.right_position)
-                    metrics[test_algo_name]['Correct Letter Count'] += len(set(test_algo.good_letters))
-                    metrics[test_algo_name]['Num Guesses'] += number_guesses
-                    metrics[test_algo_name]['Times'].append(end_time - start_time)
-                    break
-
-        if i % 10 == 0:
-            clear_output(wait=True)
-            print(f"Episode: {i}")
+if __name__=="__main__":
+    # Get required evaluation test Information, from the command line if
+    # any arguments were given and interactively otherwise
+    if len(sys.argv) > 1:
+        args = parse_arguments()
+    else:
+        args = prompt_arguments()
 
-    clear_output(wait=True)
-    print('Testing complete!\n')
+    if args.exhaustive:
+        word_list = new_game(args.word_length, word_file=args.word_file).get_word_list()
+        results = {}
+        for alg in args.algorithms:
+            results[ALGORITHMS[alg][0]] = exhaustive_evaluation(alg, word_list, args.number_guesses,
+                                                                args.first_guess, args.seed)
+        output_data = summarize_exhaustive(results)
+        pd.DataFrame(output_data).to_csv(args.output)
+        sys.exit()
 
-    output_data = {'Algo Name' : [], 'Average Win Rate' : [], 'Letter Accuracy' : [], 'Perfect Letter Accuracy' : [],
-        'Average Number of Guesses' : [], 'Average Number of Guesses to Win' : [], 'Average Run Time' : []}
+    # Loop through n number of times and get performance metrics
+    # Calculate win rate, perfect letter accuracy (how many correct letters in correct spots),
+    # letter accuracy (how many correct letter), average number of guesses,
+    # average number of guesses to win, and time. Subject to change.
+    profile = args.profile_turns is not None or args.cprofile
+    if profile:
+        # turns are recorded in this process only
+        args.workers = 1
+        profiling.enable(args.cprofile)
 
-    for i in range(len(metrics)):
-        algo = list(metrics.keys())[i]
-        algo_values = metrics[algo]
+    if args.sequential:
+        metrics = sequential_evaluate(args.algorithms, args.word_length, args.number_guesses,
+                                      workers=args.workers, seed=args.seed, confidence=args.confidence,
+                                      win_rate_width=args.win_rate_width, guesses_width=args.guesses_width,
+                                      min_trials=args.min_trials, max_trials=args.max_trials,
+                                      word_file=args.word_file)
+    elif args.batch:
+        metrics = batch_evaluate(args.algorithms, args.trials, args.word_length, args.number_guesses,
+                                 seed=args.seed, word_file=args.word_file)
+    else:
+        metrics = evaluate(args.algorithms, args.trials, args.word_length, args.number_guesses,
+                           workers=args.workers, seed=args.seed, word_file=args.word_file)
 
-        output_data['Algo Name'].append(algo)
-        output_data['Average Win Rate'].append(algo_values['Wins']/trials)
-        output_data['Letter Accuracy'].append(algo_values['Correct Letter Count'] / (trials * word_length))
-        output_data['Perfect Letter Accuracy'].append(algo_values['Perfect Letter Count'] / (trials * word_length))
-        output_data['Average Number of Guesses'].append(algo_values['Num Guesses'] / trials)
-        output_data['Average Number of Guesses to Win'].append(algo_values['Win Num Guesses'] / algo_values['Wins'])
-        output_data['Average Run Time'].append(sum(algo_values['Times']) / trials)
+    clear_output(wait=True)
+    print('Testing complete!\n')
 
-        print('Average win rate for {} was: '.format(algo), output_data['Average Win Rate'][-1])
-        print('Letter accuracy for {} was: '.format(algo), output_data['Letter Accuracy'][-1])
-        print('Perfect letter accuracy for {} was: '.format(algo), output_data['Perfect Letter Accuracy'][-1])
-        print('Average number of guesses for {} was: '.format(algo), output_data['Average Number of Guesses'][-1])
-        print('Average number of guesses to win for {} was: '.format(algo), output_data['Average Number of Guesses to Win'][-1])
-        print('Average run time for {} was: '.format(algo), output_data['Average Run Time'][-1])
-        print()
+    output_data = summarize(metrics, args.word_length, include_trials=args.sequential)
+    pd.DataFrame(output_data).to_csv(args.output)
 
-    pd.DataFrame(output_data).to_csv('outputs/full_evaluation_out.csv')
+    if profile:
+        recorder = profiling.disable()
+        for algo, values in recorder.summary().items():
+            print('Per turn for {}: {:.1f} candidates, filtering {:.6f}s, scoring {:.6f}s, game {:.6f}s'.format(
+                algo, values['candidates'], values['filter_time'], values['score_time'], values['game_time']))
+        if args.profile_turns is not None:
+            recorder.save(args.profile_turns)
+        if args.cprofile:
+            print(recorder.profile_stats())
@@ -1,11 +1,12 @@
-import requests
 import random
-import collections
+import copy
 from tkinter import messagebox
+import patterns
+import word_store
 
 
 class WordleGame:
-    def __init__(self, word_length=5, word_source="default", word_list=None, number_guesses=6):
+    def __init__(self, word_length=5, word_source="default", word_list=None, number_guesses=6, web_source=None):
         """
         Initiates the Game class
 
@@ -20,7 +21,8 @@ class WordleGame:
                     This should be dealt with in here since the formats vary
                     Current web sources are:
                     i. web_simple: this is a list created by MIT; this is a
-                        strong option when varying word_length
+                        strong option when varying word_length. It is
+                        downloaded once and cached in `word_lists`
                 3. Manual
                     The user must input the list in the `word_list` parameter
 
@@ -34,6 +36,9 @@ class WordleGame:
             If word_source is 'manual', then this is the list of allowed word guesses
         number_guesses: int, optional
             Max number of times a word can be guessed
+        web_source: str, optional
+            If word_source is 'web_simple', a URL or local file to take the
+            list from instead of the MIT list
 
         Returns
         None
@@ -49,9 +54,11 @@ class WordleGame:
             raise ValueError("number_guesses must be an int.")
         # set up variables
         if word_source == 'default':
-            words = open('word_lists/default_words.txt', 'r')
-            word_list = [word for word in words.read().splitlines()]
-            words.close()
+            # loaded once per process and shared by every game
+            word_list = word_store.get_word_store(word_length=word_length, persist=True).word_list
+            if not word_list:
+                raise ValueError("the default word list has no words of length %d; "
+                                 "use word_source='web_simple'." % word_length)
         elif word_source == "manual":
             if word_list == None:
                 raise ValueError("word_list must be provided.")
@@ -60,19 +67,48 @@ class WordleGame:
             if not all([isinstance(word, str) for word in word_list]):
                 raise ValueError("all words in word_list must be strings.")
         elif word_source == "web_simple":
-            url = "https://www.mit.edu/~ecprice/wordlist.10000"
-            r = requests.get(url, stream=True)
-            word_list = [word for word in r.text.split(
-                "\n") if len(word) == word_length]
+            # downloaded on first use, then read from word_lists/web_simple.txt
+            word_list = word_store.get_web_store(word_length, source=web_source).word_list
         self.word_list = word_list
         self.answer = random.choice(self.word_list)
         self.turn_number = 0
         self.number_guesses = number_guesses
         self.guesses = []
+        self.squares = []
         self.WIN = 1
         self.LOSE = -1
         self.game_status = 0
         self.word_length = word_length
+        # use the precomputed feedback for this word list if it is on disk
+        self.patterns = patterns.get_pattern_matrix(self.word_list, build=False)
+        # hashed lookup of the word list, shared by every game that uses it
+        self.word_set = word_store.store_for(self.word_list).word_set
+
+    def __deepcopy__(self, memo):
+        # the word list and its lookups are never modified, so copies of a
+        # game share them and only get their own guesses
+        other = copy.copy(self)
+        other.guesses = list(self.guesses)
+        other.squares = list(self.squares)
+        return other
+
+    def score_guess(self, guess):
+        '''
+        Colors of the letter blocks for a guess against the answer.
+
+        Parameters
+        ----------
+        guess: str
+            A word in the word list
+
+        Returns
+        -------
+        square: list
+            "GREEN", "YELLOW" or "GREY" for each letter
+        '''
+        if self.patterns is not None:
+            return self.patterns.squares(guess, self.answer)
+        return patterns.decode_pattern(patterns.score(guess, self.answer), len(guess))
 
     def get_guesses(self):
         '''
@@ -88,20 +124,7 @@ class WordleGame:
         guesses: tuple
             The guesses structured as (guess, colors of letter blocks)
         '''
-        squares = []
-        for guess in self.guesses:
-            square = []
-            letter_counter = collections.Counter(s for s, g in zip(self.answer, guess) if s != g)
-            for i, letter in enumerate(guess):
-                if letter == self.answer[i]:
-                    square.append("GREEN")
-                elif letter in self.answer and letter_counter[letter] > 0:
-                    square.append("YELLOW")
-                    letter_counter[letter] -= 1
-                else:
-                    square.append("GREY")
-            squares.append(square)
-        guesses = [list(x) for x in zip(self.guesses, squares)]
+        guesses = [[guess, list(square)] for guess, square in zip(self.guesses, self.squares)]
         return guesses
 
     def get_last_guess(self):
@@ -119,11 +142,9 @@ class WordleGame:
         last_squares: list
             The color of the square of the last guess
         '''
-        guesses = self.get_guesses()
-        if not guesses:
+        if not self.guesses:
             return None
-        last_guess, last_squares = guesses[-1]
-        return last_guess, last_squares
+        return self.guesses[-1], list(self.squares[-1])
 
     def get_game_status(self):
         return self.game_status
@@ -145,6 +166,7 @@ class WordleGame:
         '''
         self.turn_number = 0
         self.guesses = []
+        self.squares = []
         self.game_status = 0
 
     def guess(self, guess):
@@ -166,16 +188,13 @@ class WordleGame:
             messagebox.showinfo(
                 "Error!", f'Must guess a word of length %d' % self.word_length)
             return self.game_status
-        if not guess in self.word_list:
-            messagebox.showinfo(
-                "Error!", f'Word in not valid. Must be in the word list.')
-            return self.game_status
-        if not guess in self.word_list:
+        if not guess in self.word_set:
             # raise ValueError('Word is not valid. Must be in the word list.')
             messagebox.showinfo(
                 "Error!", f'Word in not valid. Must be in the word list.')
             return self.game_status
         self.guesses.append(guess)
+        self.squares.append(self.score_guess(guess))
         self.turn_number += 1
         if guess == self.answer:
             self.game_status = self.WIN
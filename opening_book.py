@@ -0,0 +1,111 @@
+'''
+Opening book of first and second guesses.
+
+Choosing the first guess means scoring every word against every possible
+answer, the most expensive decision of the game, and it is the same every game.
+The book stores, per word list and scoring policy, the best first guess and the
+best second guess for every feedback the first guess can get, so algorithms
+play the first two turns without any live computation. Books are small files
+in the word_lists folder keyed by a hash of the word list.
+'''
+
+import numpy as np
+import cache
+import patterns
+import trees
+
+FORMAT_VERSION = 1
+
+
+class OpeningBook:
+    def __init__(self, word_list, first, codes, seconds) -> None:
+        self.word_list = word_list
+        self.first = int(first)
+        self.codes = codes
+        self.seconds = seconds
+        self.second_by_code = {int(code): int(second) for code, second in zip(codes, seconds)}
+
+    def first_guess(self) -> str:
+        return self.word_list[self.first]
+
+    def second_guess(self, code):
+        '''
+        Best second guess after the first guess got feedback code, None if that
+        feedback cannot happen.
+        '''
+        second = self.second_by_code.get(int(code))
+        if second is None:
+            return None
+        return self.word_list[second]
+
+    def save(self, path, policy_name) -> None:
+        cache.save_arrays(path, self.word_list, FORMAT_VERSION, policy=policy_name, first=self.first,
+                          codes=self.codes, seconds=self.seconds)
+
+    @classmethod
+    def load(cls, path, word_list):
+        data = cache.load_arrays(path, word_list, FORMAT_VERSION)
+        return cls(word_list, data['first'], data['codes'], data['seconds'])
+
+
+def build_book(word_list, policy=trees.entropy_policy, full_guesses=False) -> OpeningBook:
+    '''
+    Find the best first guess and the best second guess for every feedback.
+
+    Parameters
+    ----------
+    word_list: list
+        Words that can be guessed; every word is a possible answer
+    policy: callable, optional
+        policy(matrix, guess_idx, answer_idx) scores each guess, higher is better
+    full_guesses: bool, optional
+        Consider every word as a second guess, not only the possible answers
+
+    Returns
+    -------
+    book: OpeningBook
+    '''
+    matrix = patterns.get_pattern_matrix(word_list).matrix
+    all_words = np.arange(len(word_list))
+    first = trees.best_guess(matrix, all_words, all_words, policy)
+
+    codes = matrix[first]
+    book_codes, seconds = [], []
+    for code in np.unique(codes):
+        answer_idx = np.flatnonzero(codes == code)
+        if len(answer_idx) == 1:
+            second = int(answer_idx[0])
+        else:
+            guess_idx = all_words if full_guesses else answer_idx
+            second = trees.best_guess(matrix, guess_idx, answer_idx, policy)
+        book_codes.append(code)
+        seconds.append(second)
+    return OpeningBook(word_list, first, np.array(book_codes, dtype=matrix.dtype), np.array(seconds, dtype=np.int32))
+
+
+def get_book(word_list, policy='entropy', full_guesses=False, cache_dir=cache.CACHE_DIR) -> OpeningBook:
+    '''
+    Get the opening book for a word list and policy, loading it only once per
+    process and building and saving it the first time.
+
+    Parameters
+    ----------
+    word_list: list
+        Words that can be guessed; every word is a possible answer
+    policy: str or callable, optional
+        Name in trees.POLICIES or a scoring function (its __name__ keys the file)
+    full_guesses: bool, optional
+        Consider every word as a second guess, not only the possible answers
+    cache_dir: str, optional
+        Directory holding the saved books
+
+    Returns
+    -------
+    book: OpeningBook
+    '''
+    policy_name, policy = trees.resolve_policy(policy)
+    return cache.get_cached(cache.cache_path('book', word_list, policy_name, full_guesses and 'full',
+                                             cache_dir=cache_dir),
+                            lambda path: OpeningBook.load(path, word_list),
+                            lambda: build_book(word_list, policy, full_guesses),
+                            lambda book, path: book.save(path, policy_name))
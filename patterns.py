@@ -0,0 +1,369 @@
+'''
+Feedback patterns for Wordle guesses.
+
+The feedback to a guess (the colour of every square) is encoded as a single
+base-3 integer: position i contributes colour * 3**i, where GREY is 0, YELLOW
+is 1 and GREEN is 2. For a word list of N words we precompute the N x N matrix
+of codes for every (guess, answer) pair once, save it next to the word lists
+keyed by a hash of the list contents and memory-map it on later runs so every
+process starts warm.
+'''
+
+import os
+import numpy as np
+import cache
+
+GREY = 0
+YELLOW = 1
+GREEN = 2
+COLORS = ["GREY", "YELLOW", "GREEN"]
+
+BLOCK_SIZE = 64
+# feedback codes are histogrammed directly up to this many patterns (or the
+# number of answers, if larger) and through the distinct codes beyond it
+DENSE_PATTERNS = 3**5
+
+def pattern_dtype(word_length):
+    '''
+    Smallest unsigned integer type able to hold every code for word_length
+    (codes go up to 3**word_length - 1).
+    '''
+    if word_length <= 5:
+        return np.uint8
+    if word_length <= 10:
+        return np.uint16
+    if word_length <= 20:
+        return np.uint32
+    if word_length < 40:
+        return np.uint64
+    raise ValueError("words of 40 or more letters are not supported.")
+
+
+def encode_words(word_list) -> np.ndarray:
+    '''
+    Encode a word list as an (N, L) uint8 array of character codes.
+    '''
+    if not word_list:
+        return np.zeros((0, 0), dtype=np.uint8)
+    word_length = len(word_list[0])
+    if not all(len(word) == word_length for word in word_list):
+        raise ValueError("all words in word_list must have the same length.")
+    return np.frombuffer(''.join(word_list).encode('latin-1'),
+                         dtype=np.uint8).reshape(len(word_list), word_length)
+
+
+def encode_squares(squares) -> int:
+    '''
+    Turn a list of square colours ("GREEN", "YELLOW", "GREY") into a code.
+    '''
+    code = 0
+    for i, square in enumerate(squares):
+        code += COLORS.index(square) * 3**i
+    return code
+
+
+def decode_pattern(code, word_length) -> list:
+    '''
+    Turn a code back into the list of square colours WordleGame reports.
+    '''
+    code = int(code)
+    squares = []
+    for _ in range(word_length):
+        squares.append(COLORS[code % 3])
+        code //= 3
+    return squares
+
+
+def letter_counts(words) -> np.ndarray:
+    '''
+    How many times each character code occurs in each word.
+
+    Parameters
+    ----------
+    words: np.ndarray
+        (N, L) encoded words
+
+    Returns
+    -------
+    counts: np.ndarray
+        (N, 256) counts, indexed by character code
+    '''
+    counts = np.zeros((words.shape[0], 256), dtype=np.uint8)
+    rows = np.arange(words.shape[0])
+    for i in range(words.shape[1]):
+        np.add.at(counts, (rows, words[:, i]), 1)
+    return counts
+
+
+def score(guess, answer) -> int:
+    '''
+    Feedback code of one guess against one answer.
+
+    Duplicate letters follow the game's rules: a letter is yellow only while
+    the answer still has unmatched copies of it, consumed left to right.
+    '''
+    unmatched = {}
+    for g, a in zip(guess, answer):
+        if g != a:
+            unmatched[a] = unmatched.get(a, 0) + 1
+    code = 0
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            code += GREEN * 3**i
+        elif unmatched.get(g, 0) > 0:
+            code += YELLOW * 3**i
+            unmatched[g] -= 1
+    return code
+
+
+def score_block(guesses, answers, counts=None) -> np.ndarray:
+    '''
+    Score every guess against every answer, with the same rules as score.
+
+    A guess letter that is not green is yellow while fewer of its earlier
+    non-green copies in the guess are yellow than the answer has unmatched
+    copies of it, i.e. copies of the letter minus the green ones.
+
+    Parameters
+    ----------
+    guesses: np.ndarray
+        (G, L) encoded guesses
+    answers: np.ndarray
+        (N, L) encoded answers
+    counts: np.ndarray, optional
+        letter_counts(answers), if already computed
+
+    Returns
+    -------
+    codes: np.ndarray
+        (G, N) feedback codes
+    '''
+    if counts is None:
+        counts = letter_counts(answers)
+    word_length = guesses.shape[1]
+    green = guesses[:, None, :] == answers[None, :, :]
+    # same_letter[g, i, j]: guess g has the same letter at positions i and j;
+    # the per-position sums below are small matrix products over positions
+    same_letter = (guesses[:, :, None] == guesses[:, None, :]).astype(np.float32)
+    earlier = same_letter * np.triu(np.ones((word_length, word_length), dtype=np.float32), 1)
+    # copies of each guess letter in the answer not matched by a green square
+    available = counts[:, guesses].transpose(1, 0, 2) - green.astype(np.float32) @ same_letter
+    # earlier copies of each guess letter that are not green
+    used = (~green).astype(np.float32) @ earlier
+    yellow = ~green & (used < available)
+    powers = 3**np.arange(word_length)
+    return ((GREEN * green + YELLOW * yellow) @ powers).astype(pattern_dtype(word_length))
+
+
+def score_many(guess, answers, counts=None) -> np.ndarray:
+    '''
+    Feedback codes of one guess against many answers.
+
+    Parameters
+    ----------
+    guess: str
+        The guess
+    answers: list or np.ndarray
+        Answers as words or as an (N, L) encoded array. The encoding and
+        letter counts of a list are kept on its word store (see
+        word_store.store_for), so repeated calls only score
+    counts: np.ndarray, optional
+        letter_counts of an encoded array of answers, to reuse across calls
+
+    Returns
+    -------
+    codes: np.ndarray
+        (N,) feedback codes
+    '''
+    if not isinstance(answers, np.ndarray):
+        import word_store
+        store = word_store.store_for(answers)
+        answers, counts = store.words, store.letter_counts
+    return score_block(encode_words([guess]), answers, counts)[0]
+
+
+def build_pattern_matrix(word_list) -> np.ndarray:
+    '''
+    Compute the full guess x answer matrix of feedback codes.
+    '''
+    import word_store
+    store = word_store.store_for(word_list)
+    words, counts = store.words, store.letter_counts
+    matrix = np.empty((len(words), len(words)), dtype=pattern_dtype(words.shape[1]))
+    for start in range(0, len(words), BLOCK_SIZE):
+        matrix[start:start + BLOCK_SIZE] = score_block(words[start:start + BLOCK_SIZE], words, counts)
+    return matrix
+
+
+class PatternMatrix:
+    '''
+    Precomputed feedback for every (guess, answer) pair of a word list.
+
+    Rows are guesses and columns are answers, both in word_list order.
+    The object is read-only and shared: copies and pickles refer back to the
+    same cache file instead of duplicating the matrix.
+    '''
+    def __init__(self, word_list, matrix, path=None) -> None:
+        self.word_list = list(word_list)
+        self.word_length = len(self.word_list[0])
+        self.matrix = matrix
+        self.path = path
+        self.index = {word: i for i, word in enumerate(self.word_list)}
+
+    def feedback(self, guess, answer) -> int:
+        return int(self.matrix[self.index[guess], self.index[answer]])
+
+    def squares(self, guess, answer) -> list:
+        return decode_pattern(self.feedback(guess, answer), self.word_length)
+
+    def row(self, guess) -> np.ndarray:
+        return self.matrix[self.index[guess]]
+
+    def indices(self, words) -> np.ndarray:
+        return np.array([self.index[word] for word in words], dtype=np.int64)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (get_pattern_matrix, (self.word_list, os.path.dirname(self.path)))
+
+
+def pattern_histograms(matrix, guess_idx, answer_idx, max_cells=1 << 22):
+    '''
+    Count how many answers give each feedback pattern, for a batch of guesses.
+
+    Each row of the pattern matrix is histogrammed over the answers with a
+    single bincount, in chunks of guesses so memory stays bounded. For long
+    words there are far more possible codes than answers, so the codes of each
+    row are sorted and counted by runs instead; the columns of counts are then
+    the distinct patterns of each row rather than the codes themselves, which
+    is all the entropy and size statistics below need.
+
+    Parameters
+    ----------
+    matrix: np.ndarray
+        Pattern matrix (guesses x answers)
+    guess_idx: np.ndarray
+        Row indices of the guesses to score
+    answer_idx: np.ndarray
+        Column indices of the possible answers
+    max_cells: int, optional
+        Upper bound on guesses x answers handled per chunk
+
+    Yields
+    ------
+    start: int
+        Position in guess_idx of the first guess in the chunk
+    counts: np.ndarray
+        (guesses in chunk, patterns) answer counts, zero for unused columns
+    '''
+    guess_idx = np.asarray(guess_idx, dtype=np.int64)
+    answer_idx = np.asarray(answer_idx, dtype=np.int64)
+    chunk = max(1, max_cells // max(1, len(answer_idx)))
+    for start in range(0, len(guess_idx), chunk):
+        rows = guess_idx[start:start + chunk]
+        # gather only the needed cells, not whole rows of the matrix
+        codes = matrix[np.ix_(rows, answer_idx)].astype(np.int64)
+        num_patterns = int(codes.max(initial=0)) + 1
+        if num_patterns > max(len(answer_idx), DENSE_PATTERNS):
+            # number the distinct codes of each row 0, 1, ... in sorted order
+            codes.sort(axis=1)
+            new_pattern = np.ones(codes.shape, dtype=bool)
+            new_pattern[:, 1:] = codes[:, 1:] != codes[:, :-1]
+            codes = np.cumsum(new_pattern, axis=1) - 1
+            num_patterns = int(codes.max(initial=0)) + 1
+        codes += (np.arange(len(rows)) * num_patterns)[:, None]
+        counts = np.bincount(codes.ravel(), minlength=len(rows) * num_patterns)
+        yield start, counts.reshape(len(rows), num_patterns)
+
+
+def pattern_entropies(matrix, guess_idx, answer_idx, max_cells=1 << 22) -> np.ndarray:
+    '''
+    Entropy in bits of the feedback distribution for a batch of guesses.
+    '''
+    entropies = np.zeros(len(guess_idx))
+    n = len(answer_idx)
+    if n == 0:
+        return entropies
+    # H = log2(n) - sum(c * log2(c)) / n over the pattern counts c, with
+    # c * log2(c) looked up instead of computed for every cell
+    c_log_c = np.arange(n + 1, dtype=np.float64)
+    c_log_c[1:] *= np.log2(c_log_c[1:])
+    for start, counts in pattern_histograms(matrix, guess_idx, answer_idx, max_cells):
+        entropies[start:start + len(counts)] = np.log2(n) - c_log_c[counts].sum(axis=1) / n
+    return entropies
+
+
+def pattern_expected_sizes(matrix, guess_idx, answer_idx, max_cells=1 << 22) -> np.ndarray:
+    '''
+    Expected number of answers left after each guess in a batch.
+    '''
+    sizes = np.zeros(len(guess_idx))
+    if len(answer_idx) == 0:
+        return sizes
+    for start, counts in pattern_histograms(matrix, guess_idx, answer_idx, max_cells):
+        sizes[start:start + len(counts)] = (counts.astype(np.float64)**2).sum(axis=1) / len(answer_idx)
+    return sizes
+
+
+def pattern_max_sizes(matrix, guess_idx, answer_idx, max_cells=1 << 22) -> np.ndarray:
+    '''
+    Worst-case number of answers left after each guess in a batch.
+    '''
+    sizes = np.zeros(len(guess_idx))
+    if len(answer_idx) == 0:
+        return sizes
+    for start, counts in pattern_histograms(matrix, guess_idx, answer_idx, max_cells):
+        sizes[start:start + len(counts)] = counts.max(axis=1)
+    return sizes
+
+
+def cache_path(word_list, cache_dir=cache.CACHE_DIR) -> str:
+    return cache.cache_path('patterns', word_list, ext='.npy', cache_dir=cache_dir)
+
+
+def save_matrix(matrix, path) -> None:
+    # write then rename so concurrent processes never see a partial file
+    with cache.atomic_write(path) as f:
+        np.save(f, matrix)
+
+
+def get_pattern_matrix(word_list, cache_dir=cache.CACHE_DIR, build=True):
+    '''
+    Get the pattern matrix for a word list, loading it only once per process.
+
+    Parameters
+    ----------
+    word_list: list
+        Words to compute feedback for; all must be the same length
+    cache_dir: str, optional
+        Directory holding the cached matrices
+    build: bool, optional
+        If False, only return a matrix that is already cached
+
+    Returns
+    -------
+    patterns: PatternMatrix
+        None if build is False and there is no cached matrix
+    '''
+    path = cache_path(word_list, cache_dir)
+    if not build and not cache.is_cached(path):
+        return None
+
+    def load(path):
+        return PatternMatrix(word_list, np.load(path, mmap_mode='r'), path)
+
+    def build_saved():
+        # saved first so the matrix is memory-mapped like a cached one
+        save_matrix(build_pattern_matrix(word_list), path)
+        return load(path)
+
+    return cache.get_cached(path, load, build_saved)
+
+
+if __name__ == "__main__":
+    # warm the cache for the default word list
+    import word_store
+    word_list = word_store.get_word_store().word_list
+    print(get_pattern_matrix(word_list).path)
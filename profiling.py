@@ -0,0 +1,122 @@
+'''
+Per-turn timing of games.
+
+While a TurnRecorder is active (see enable), evaluation.play_game records for
+every turn of every game: the algorithm, trial and turn, the number of words
+the algorithm still considered possible, and the wall time split into
+
+    filter_time  narrowing the possible words (BaseAlgorithm.update_remaining_words)
+    score_time   the rest of make_guess: scoring and picking the guess
+    game_time    the game side: get_last_guess and guess
+
+The recorder can also run cProfile over the same span. When no recorder is
+active the only cost is checking the module-level recorder for None.
+'''
+
+import cProfile
+import csv
+import functools
+import io
+import json
+import pstats
+import time
+
+# the active TurnRecorder, None when profiling is off
+recorder = None
+
+FIELDS = ['algorithm', 'trial', 'turn', 'candidates', 'filter_time', 'score_time', 'game_time']
+
+
+class TurnRecorder:
+    def __init__(self, profile=False) -> None:
+        self.rows = []
+        # filtering time of the current turn, added to by the algorithms
+        self.filter_time = 0.0
+        self.profiler = cProfile.Profile() if profile else None
+
+    def start_turn(self) -> None:
+        self.filter_time = 0.0
+
+    def record(self, algorithm, trial, turn, candidates, guess_time, game_time) -> None:
+        '''
+        Record a turn; guess_time is the time spent in make_guess.
+        '''
+        self.rows.append({'algorithm': algorithm, 'trial': trial, 'turn': turn, 'candidates': candidates,
+                          'filter_time': self.filter_time, 'score_time': guess_time - self.filter_time,
+                          'game_time': game_time})
+
+    def summary(self) -> dict:
+        '''
+        Per algorithm: turns recorded, mean candidates and mean time of each phase per turn.
+        '''
+        totals = {}
+        for row in self.rows:
+            total = totals.setdefault(row['algorithm'], dict.fromkeys(['turns'] + FIELDS[3:], 0))
+            total['turns'] += 1
+            for field in FIELDS[3:]:
+                total[field] += row[field]
+        return {algorithm: {'turns': total['turns'],
+                            **{field: total[field] / total['turns'] for field in FIELDS[3:]}}
+                for algorithm, total in totals.items()}
+
+    def save(self, path) -> None:
+        '''
+        Write the turns to path, as JSON lines if it ends with .jsonl and as csv otherwise.
+        '''
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.jsonl'):
+                for row in self.rows:
+                    f.write(json.dumps(row) + '\n')
+            else:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.rows)
+
+    def profile_stats(self, sort='cumulative', limit=20) -> str:
+        '''
+        Top functions from cProfile, if the recorder was enabled with profile=True.
+        '''
+        if self.profiler is None:
+            return ''
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+def enable(profile=False) -> TurnRecorder:
+    '''
+    Start recording turns (and running cProfile if profile is True).
+    '''
+    global recorder
+    recorder = TurnRecorder(profile)
+    if recorder.profiler is not None:
+        recorder.profiler.enable()
+    return recorder
+
+
+def disable() -> TurnRecorder:
+    '''
+    Stop recording; returns the recorder with what it recorded.
+    '''
+    global recorder
+    stopped, recorder = recorder, None
+    if stopped is not None and stopped.profiler is not None:
+        stopped.profiler.disable()
+    return stopped
+
+
+def timed_filter(function):
+    '''
+    Decorator adding the time spent in function to the active recorder's filter_time.
+    '''
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if recorder is None:
+            return function(*args, **kwargs)
+        start_time = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if recorder is not None:
+                recorder.filter_time += time.perf_counter() - start_time
+    return wrapper
@@ -0,0 +1,135 @@
+'''
+Binary storage for QLearn policies.
+
+A policy file holds one float32 Q-value per word, aligned with the word list
+it was trained on (NaN for words the agent never learned a value for), after a
+small header:
+
+    magic       8 bytes, b'WQPOLICY'
+    version     uint32
+    header size uint32
+    header      JSON: word list hash, word count and training hyperparameters,
+                padded with spaces so the values start on a 16 byte boundary
+
+The values are memory-mapped on load, so reading a policy costs the same for
+any word list size and lookups are plain array indexing. Policies for word
+lists other than the one the shipped q_policy.bin was trained on are kept in
+the word_lists folder, keyed by a hash of the list (see policy_path).
+
+Training checkpoints (Q-values, visit counts, random state and episode number)
+are saved separately as .npz files.
+'''
+
+import json
+import os
+import pickle
+import struct
+import numpy as np
+import cache
+
+MAGIC = b'WQPOLICY'
+FORMAT_VERSION = 1
+
+
+def save_policy(path, word_list, q_values, **hyperparameters) -> None:
+    '''
+    Write Q-values (one per word of word_list) and the training settings.
+    '''
+    header = {'word_list_hash': cache.word_list_hash(word_list), 'word_count': len(word_list),
+              'hyperparameters': hyperparameters}
+    header = json.dumps(header).encode()
+    prefix_size = len(MAGIC) + 8
+    header += b' ' * (-(prefix_size + len(header)) % 16)
+    with cache.atomic_write(path) as f:
+        f.write(MAGIC + struct.pack('<II', FORMAT_VERSION, len(header)) + header)
+        f.write(np.asarray(q_values, dtype='<f4').tobytes())
+
+
+def read_header(path) -> tuple:
+    '''
+    Header of a policy file and the offset its values start at.
+    '''
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError("%s is not a Q-policy file." % path)
+        version, header_size = struct.unpack('<II', f.read(8))
+        if version != FORMAT_VERSION:
+            raise ValueError("%s has unsupported version %d." % (path, version))
+        header = json.loads(f.read(header_size))
+    return header, len(MAGIC) + 8 + header_size
+
+
+def trained_on(path, word_list) -> bool:
+    '''
+    Whether path holds a policy trained on word_list.
+    '''
+    return os.path.exists(path) and read_header(path)[0]['word_list_hash'] == cache.word_list_hash(word_list)
+
+
+def policy_path(word_list, default_path) -> str:
+    '''
+    default_path if it holds a policy for word_list, else the policy file for
+    word_list in the cache folder (keyed by its hash).
+    '''
+    if trained_on(default_path, word_list):
+        return default_path
+    return cache.cache_path('q_policy', word_list, ext='.bin')
+
+
+def load_policy(path, word_list) -> tuple:
+    '''
+    Memory-map the Q-values of a policy file.
+
+    Parameters
+    ----------
+    path: str
+        Policy file
+    word_list: list
+        Word list the policy must have been trained on
+
+    Returns
+    -------
+    q_values: np.ndarray
+        Read-only float32 values aligned with word_list
+    header: dict
+        Word list hash, word count and training hyperparameters
+    '''
+    header, offset = read_header(path)
+    if header['word_list_hash'] != cache.word_list_hash(word_list):
+        raise ValueError("%s was trained on a different word list." % path)
+    q_values = np.memmap(path, dtype='<f4', mode='r', offset=offset, shape=(header['word_count'],))
+    return q_values, header
+
+
+def save_checkpoint(path, word_list, q_values, visited, counts, episode, previous_episodes, random_state) -> None:
+    '''
+    Save the full training state so training can resume from it.
+    '''
+    cache.save_arrays(path, word_list, FORMAT_VERSION, q_values=q_values, visited=visited, counts=counts,
+                      episode=episode, previous_episodes=previous_episodes,
+                      random_state=np.frombuffer(pickle.dumps(random_state), dtype=np.uint8))
+
+
+def load_checkpoint(path, word_list) -> dict:
+    '''
+    Load a training checkpoint saved by save_checkpoint.
+    '''
+    data = cache.load_arrays(path, word_list, FORMAT_VERSION)
+    return {'q_values': data['q_values'], 'visited': data['visited'], 'counts': data['counts'],
+            'episode': int(data['episode']), 'previous_episodes': int(data['previous_episodes']),
+            'random_state': pickle.loads(data['random_state'].tobytes())}
+
+
+def convert_csv_policy(csv_path, path, word_list) -> None:
+    '''
+    Convert a policy saved in the old one-row csv format (one column per word).
+    '''
+    import pandas as pd
+    policy = pd.read_csv(csv_path, index_col=0)
+    q_values = np.full(len(word_list), np.nan)
+    position = {word: i for i, word in enumerate(word_list)}
+    for word, value in policy.iloc[0].items():
+        if word in position:
+            q_values[position[word]] = value
+    save_policy(path, word_list, q_values, converted_from=csv_path)
@@ -1,20 +1,23 @@
 
 import math
 from itertools import product
+import numpy as np
+from patterns import score_many
 
 words = open('word_lists/default_words.txt', 'r')
 word_list = [word for word in words.read().splitlines()]
 words.close()
+word_length = len(word_list[0])
 
 
 a = []
-for _set in product(['g','y','b'], repeat=5):
+for _set in product(['g','y','b'], repeat=word_length):
     a.append(''.join(_set))
 
 valid_permutations = []
 
 for i in a:
-    if(i.count('g')==4 and i.count('y')==1):
+    if(i.count('g')==word_length-1 and i.count('y')==1):
         continue
     valid_permutations.append(i)
     
@@ -77,33 +80,17 @@ pwords = {}
 
 probs = []
 
-patterns = {}
-
 word = "smash"
 entropy = 0
 
+# feedback of the guess against every word, with the game's duplicate letter rules
+codes = score_many(word, word_list)
+_, counts = np.unique(codes, return_counts=True)
 
-for w in word_list:
-    p = ""
-    for i in range(len(w)):
-        if w[i]==word[i]:
-            p+="g"
-        elif w[i] in word:
-            p+="y"
-        elif w[i] not in word:
-            p+="b"
-    if p in patterns:
-        patterns[p]+=1
-    else:
-        patterns[p]=1
-
-for k,v in patterns.items():
-    if v!=0:
-        prob = v/len(word_list)
-        probs.append(prob)
-        info = -1 * math.log(prob,2)
-        entropy+=prob*info
-        
-print(word, entropy)
-
+for v in counts:
+    prob = v/len(word_list)
+    probs.append(prob)
+    info = -1 * math.log(prob,2)
+    entropy+=prob*info
 
+print(word, entropy)
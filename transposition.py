@@ -0,0 +1,107 @@
+'''
+Transposition tables for searches over sets of possible answers.
+
+Many different guess histories leave the same set of possible answers, so a
+search can store what it learned about a set and reuse it whenever the set
+comes up again. Sets are keyed by a fingerprint of their sorted word indices.
+Tables are bounded with least-recently-used eviction, shared by every search
+on the same word list in a process and can be saved in the word_lists folder
+to be reused by later runs.
+'''
+
+import atexit
+import hashlib
+import os
+from collections import OrderedDict
+import numpy as np
+import cache
+
+_tables = {}
+
+
+def fingerprint(answer_idx) -> bytes:
+    '''
+    Canonical key for a set of word indices (given in sorted order).
+    '''
+    return hashlib.blake2b(np.asarray(answer_idx, dtype=np.int32).tobytes(), digest_size=16).digest()
+
+
+class TranspositionTable:
+    '''
+    Maps fingerprints to entries, evicting the least recently used entry once
+    maxsize is reached. Entries are numbers or tuples of numbers of the same
+    length, e.g. (depth, guess) pairs or a float score per set.
+    '''
+    def __init__(self, maxsize=1000000, path=None) -> None:
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def save(self, path=None) -> None:
+        path = path or self.path
+        # raw bytes, since an 'S16' array would drop trailing NUL bytes of the keys
+        keys = np.frombuffer(b''.join(self.entries.keys()), dtype=np.uint8).reshape(-1, 16)
+        values = np.array(list(self.entries.values()))
+        with cache.atomic_write(path) as f:
+            np.savez(f, keys=keys, values=values)
+
+    def load(self, path=None) -> None:
+        path = path or self.path
+        data = np.load(path)
+        # tables saved with 'S16' keys hold the same 16 bytes per key
+        keys = data['keys'].view(np.uint8).reshape(-1, 16)
+        for key, value in zip(keys, data['values']):
+            self.put(bytes(key), tuple(value.tolist()) if value.ndim else value.item())
+
+
+def get_table(word_list, name, maxsize=1000000, persist=False, cache_dir=cache.CACHE_DIR) -> TranspositionTable:
+    '''
+    Get the table a search called name uses for a word list, shared by every
+    search in the process.
+
+    Parameters
+    ----------
+    word_list: list
+        Word list the fingerprinted indices refer to
+    name: str
+        Identifies the search (and any settings its entries depend on)
+    maxsize: int, optional
+        Number of entries kept before least recently used ones are evicted
+    persist: bool, optional
+        Load the table from cache_dir and save it back when the process exits
+    cache_dir: str, optional
+        Directory holding the saved tables
+
+    Returns
+    -------
+    table: TranspositionTable
+    '''
+    path = cache.cache_path('transpositions', word_list, name, cache_dir=cache_dir)
+    if path not in _tables:
+        table = TranspositionTable(maxsize, path)
+        if persist:
+            if os.path.exists(path):
+                table.load()
+            atexit.register(table.save)
+        _tables[path] = table
+    return _tables[path]
@@ -0,0 +1,192 @@
+'''
+Precomputed decision trees of guesses.
+
+A decision tree stores, for every feedback history that can happen, the guess
+to make next. Each node holds a guess and one edge per feedback code leading to
+the next node, so playing a game is one array lookup per turn. Trees are built
+once per word list and scoring policy and saved as a small binary file in the
+word_lists folder.
+
+The tree is kept in flat arrays: node_guess[n] is the word index guessed at
+node n, and the edges of node n are edge_code[edge_start[n]:edge_start[n + 1]]
+(sorted) with the matching child nodes in edge_child.
+'''
+
+from collections import deque
+import numpy as np
+import cache
+import patterns
+
+FORMAT_VERSION = 1
+
+
+def entropy_policy(matrix, guess_idx, answer_idx) -> np.ndarray:
+    '''
+    Score guesses by the entropy of their feedback (higher is better).
+    '''
+    return patterns.pattern_entropies(matrix, guess_idx, answer_idx)
+
+
+def expected_size_policy(matrix, guess_idx, answer_idx) -> np.ndarray:
+    '''
+    Score guesses by the expected number of answers left (fewer is better).
+    '''
+    return -patterns.pattern_expected_sizes(matrix, guess_idx, answer_idx)
+
+
+def worst_size_policy(matrix, guess_idx, answer_idx) -> np.ndarray:
+    '''
+    Score guesses by the worst-case number of answers left (fewer is better).
+    '''
+    return -patterns.pattern_max_sizes(matrix, guess_idx, answer_idx)
+
+
+POLICIES = {
+    'entropy': entropy_policy,
+    'expected_size': expected_size_policy,
+    'worst_size': worst_size_policy,
+}
+
+
+def resolve_policy(policy) -> tuple:
+    '''
+    (name, scoring function) for a name in POLICIES or a scoring function,
+    whose __name__ then keys the cache files.
+    '''
+    if isinstance(policy, str):
+        return policy, POLICIES[policy]
+    return policy.__name__, policy
+
+
+def best_guess(matrix, guess_idx, answer_idx, policy) -> int:
+    '''
+    Index of the best scoring guess; among equally good guesses prefer one
+    that could still be the answer.
+    '''
+    scores = policy(matrix, guess_idx, answer_idx)
+    best = np.flatnonzero(np.isclose(scores, scores.max()))
+    is_answer = np.isin(guess_idx[best], answer_idx)
+    if is_answer.any():
+        best = best[is_answer]
+    return int(guess_idx[best[0]])
+
+
+class DecisionTree:
+    def __init__(self, word_list, node_guess, edge_start, edge_code, edge_child) -> None:
+        self.word_list = word_list
+        self.node_guess = node_guess
+        self.edge_start = edge_start
+        self.edge_code = edge_code
+        self.edge_child = edge_child
+
+    def __len__(self) -> int:
+        return len(self.node_guess)
+
+    def guess(self, node) -> str:
+        return self.word_list[self.node_guess[node]]
+
+    def child(self, node, code) -> int:
+        '''
+        Node reached from node after feedback code; -1 if the tree has none.
+        '''
+        start, end = self.edge_start[node], self.edge_start[node + 1]
+        i = start + np.searchsorted(self.edge_code[start:end], code)
+        if i < end and self.edge_code[i] == code:
+            return int(self.edge_child[i])
+        return -1
+
+    def save(self, path, policy_name) -> None:
+        cache.save_arrays(path, self.word_list, FORMAT_VERSION, policy=policy_name, node_guess=self.node_guess,
+                          edge_start=self.edge_start, edge_code=self.edge_code, edge_child=self.edge_child)
+
+    @classmethod
+    def load(cls, path, word_list):
+        data = cache.load_arrays(path, word_list, FORMAT_VERSION)
+        return cls(word_list, data['node_guess'], data['edge_start'], data['edge_code'], data['edge_child'])
+
+
+def build_tree(word_list, policy=entropy_policy, first_guess=None, full_guesses=False) -> DecisionTree:
+    '''
+    Build the full decision tree over a word list.
+
+    Parameters
+    ----------
+    word_list: list
+        Words that can be guessed; every word is a possible answer
+    policy: callable, optional
+        policy(matrix, guess_idx, answer_idx) scores each guess, higher is better
+    first_guess: str, optional
+        Guess at the root; picked by the policy if None
+    full_guesses: bool, optional
+        Consider every word as a guess, not only the possible answers
+
+    Returns
+    -------
+    tree: DecisionTree
+    '''
+    pattern_matrix = patterns.get_pattern_matrix(word_list)
+    matrix = pattern_matrix.matrix
+    solved = 3**pattern_matrix.word_length - 1
+    all_words = np.arange(len(word_list))
+
+    node_guess, edge_start, edge_code, edge_child = [], [], [], []
+    # nodes are expanded breadth first so every node's edges are contiguous
+    queue = deque([all_words])
+    while queue:
+        answer_idx = queue.popleft()
+        if len(node_guess) == 0 and first_guess is not None:
+            guess = pattern_matrix.index[first_guess]
+        elif len(answer_idx) == 1:
+            guess = int(answer_idx[0])
+        else:
+            guess_idx = all_words if full_guesses else answer_idx
+            guess = best_guess(matrix, guess_idx, answer_idx, policy)
+        node_guess.append(guess)
+        edge_start.append(len(edge_code))
+
+        codes = matrix[guess][answer_idx]
+        for code in np.unique(codes):
+            if code == solved:
+                continue
+            edge_code.append(code)
+            edge_child.append(len(node_guess) + len(queue))
+            queue.append(answer_idx[codes == code])
+    edge_start.append(len(edge_code))
+
+    return DecisionTree(word_list, np.array(node_guess, dtype=np.int32), np.array(edge_start, dtype=np.int32),
+                        np.array(edge_code, dtype=matrix.dtype), np.array(edge_child, dtype=np.int32))
+
+
+def tree_path(word_list, policy_name, first_guess=None, full_guesses=False, cache_dir=cache.CACHE_DIR) -> str:
+    return cache.cache_path('tree', word_list, policy_name, first_guess, full_guesses and 'full',
+                            cache_dir=cache_dir)
+
+
+def get_tree(word_list, policy='entropy', first_guess=None, full_guesses=False,
+             cache_dir=cache.CACHE_DIR) -> DecisionTree:
+    '''
+    Get the decision tree for a word list and policy, loading it only once
+    per process and building and saving it the first time.
+
+    Parameters
+    ----------
+    word_list: list
+        Words that can be guessed; every word is a possible answer
+    policy: str or callable, optional
+        Name in POLICIES or a scoring function (its __name__ keys the file)
+    first_guess: str, optional
+        Guess at the root; picked by the policy if None
+    full_guesses: bool, optional
+        Consider every word as a guess, not only the possible answers
+    cache_dir: str, optional
+        Directory holding the saved trees
+
+    Returns
+    -------
+    tree: DecisionTree
+    '''
+    policy_name, policy = resolve_policy(policy)
+    return cache.get_cached(tree_path(word_list, policy_name, first_guess, full_guesses, cache_dir),
+                            lambda path: DecisionTree.load(path, word_list),
+                            lambda: build_tree(word_list, policy, first_guess, full_guesses),
+                            lambda tree, path: tree.save(path, policy_name))
@@ -0,0 +1,74 @@
+'''
+Letter indexes over a word list for fast candidate filtering.
+
+For every letter we keep a boolean array over the word list saying which words
+contain it, and for every (position, letter) pair which words have that letter
+in that position. Narrowing a candidate set is then a handful of vectorized
+AND / AND NOT operations instead of a Python scan over every word.
+'''
+
+import numpy as np
+import cache
+import word_store
+
+_indexes = {}
+
+
+class WordIndex:
+    def __init__(self, word_list, key=None) -> None:
+        self.word_list = list(word_list)
+        self.words = word_store.store_for(word_list, key).words
+        self.word_length = self.words.shape[1]
+        self.position = {word: i for i, word in enumerate(self.word_list)}
+        letters = [chr(c) for c in np.unique(self.words)]
+        self.letter_row = {letter: i for i, letter in enumerate(letters)}
+        codes = np.array([ord(letter) for letter in letters], dtype=np.uint8)
+        # letter_ids[n, pos]: row (in letter_row) of the letter of word n at position pos
+        lookup = np.zeros(256, dtype=np.int64)
+        lookup[codes] = np.arange(len(codes))
+        self.letter_ids = lookup[self.words]
+        # letter_at[i, pos, n]: word n has letter i at position pos
+        self.letter_at = self.words.T[None, :, :] == codes[:, None, None]
+        # has_letter[i, n]: word n contains letter i
+        self.has_letter = self.letter_at.any(axis=1)
+        # letter_count[i, n]: copies of letter i in word n
+        self.letter_count = self.letter_at.sum(axis=1, dtype=np.uint8)
+        self.empty = np.zeros(len(self.word_list), dtype=bool)
+
+    def all_words(self) -> np.ndarray:
+        return np.ones(len(self.word_list), dtype=bool)
+
+    def with_letter(self, letter) -> np.ndarray:
+        if letter not in self.letter_row:
+            return self.empty
+        return self.has_letter[self.letter_row[letter]]
+
+    def with_letter_at(self, pos, letter) -> np.ndarray:
+        if letter not in self.letter_row:
+            return self.empty
+        return self.letter_at[self.letter_row[letter], pos]
+
+    def with_letter_count(self, letter, at_least=0, at_most=None) -> np.ndarray:
+        '''
+        Words with between at_least and at_most (inclusive) copies of letter.
+        '''
+        if letter not in self.letter_row:
+            return self.all_words() if at_least == 0 else self.empty
+        counts = self.letter_count[self.letter_row[letter]]
+        mask = counts >= at_least
+        if at_most is not None:
+            mask &= counts <= at_most
+        return mask
+
+    def words_in(self, mask) -> list:
+        return [self.word_list[i] for i in np.flatnonzero(mask)]
+
+
+def get_word_index(word_list) -> WordIndex:
+    '''
+    Get the index for a word list, building it only once per process.
+    '''
+    key = cache.word_list_hash(word_list)
+    if key not in _indexes:
+        _indexes[key] = WordIndex(word_list, key)
+    return _indexes[key]
@@ -0,0 +1,305 @@
+'''
+Word lists loaded once per process.
+
+A WordStore holds a word list both as a fixed-width uint8 array of shape
+(N, L), one letter code per cell (see patterns.encode_words), and as the list
+of strings the games and algorithms use. Stores are cached at module level, so
+every game and algorithm in a process shares one copy of each list, and worker
+processes forked after a store is loaded share it too. The word index, the
+pattern matrix builds and the games take the encoded words and the word set
+from the store of their word list (see store_for) instead of making their own.
+
+A store can also be saved as a .npy file next to its text file and
+memory-mapped by later runs, which then skip parsing and encoding the text and
+share the encoded words through the page cache. The list of strings is only
+decoded from the array when something asks for it.
+
+Word lists from the web are downloaded once into the word_lists folder, in a
+file named after their URL with the SHA-1 of their contents next to it, and
+read from there afterwards; see get_web_store.
+'''
+
+import argparse
+import hashlib
+import os
+import numpy as np
+import cache
+import patterns
+
+DEFAULT_WORDS = 'word_lists/default_words.txt'
+WEB_SIMPLE_URL = 'https://www.mit.edu/~ecprice/wordlist.10000'
+WEB_SIMPLE_CACHE = os.path.join(cache.CACHE_DIR, 'web_simple.txt')
+# a local file (e.g. a test fixture) to use instead of WEB_SIMPLE_URL
+WEB_SIMPLE_ENV = 'WORDLE_WEB_SIMPLE'
+
+_stores = {}
+
+
+def decode_words(words) -> list:
+    '''
+    Turn an (N, L) uint8 array of letter codes back into a list of words.
+    '''
+    words = np.ascontiguousarray(words, dtype=np.uint8)
+    return [word.decode('latin-1') for word in words.view('S%d' % words.shape[1]).ravel()]
+
+
+def read_words(lines, word_length=None) -> list:
+    '''
+    Words from an iterable of lines, one word per line, optionally keeping
+    only the words of a given length.
+    '''
+    word_list = []
+    for line in lines:
+        word = line.strip()
+        if word and (word_length is None or len(word) == word_length):
+            word_list.append(word)
+    return word_list
+
+
+class WordStore:
+    def __init__(self, words, word_list=None) -> None:
+        self.words = words
+        self.word_length = words.shape[1]
+        self._word_list = word_list
+        self._word_set = None
+        self._hash = None
+        self._letter_counts = None
+
+    @property
+    def word_list(self) -> list:
+        if self._word_list is None:
+            self._word_list = decode_words(self.words)
+        return self._word_list
+
+    @property
+    def word_set(self) -> frozenset:
+        if self._word_set is None:
+            self._word_set = frozenset(self.word_list)
+        return self._word_set
+
+    @property
+    def letter_counts(self) -> np.ndarray:
+        '''
+        patterns.letter_counts of the words, computed on first use.
+        '''
+        if self._letter_counts is None:
+            self._letter_counts = patterns.letter_counts(self.words)
+        return self._letter_counts
+
+    @property
+    def hash(self) -> str:
+        if self._hash is None:
+            self._hash = cache.word_list_hash(self.word_list)
+        return self._hash
+
+    def __len__(self) -> int:
+        return len(self.word_list)
+
+    @classmethod
+    def from_list(cls, word_list):
+        return cls(patterns.encode_words(word_list), list(word_list))
+
+    def save(self, path) -> None:
+        with cache.atomic_write(path) as f:
+            np.save(f, np.asarray(self.words, dtype=np.uint8))
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path, mmap_mode='r'))
+
+
+def store_path(path, word_length=None) -> str:
+    '''
+    Binary file a store read from the text file path is saved to.
+    '''
+    name = os.path.splitext(path)[0]
+    if word_length is not None:
+        name += '_%d' % word_length
+    return name + '.npy'
+
+
+def get_word_store(path=DEFAULT_WORDS, word_length=None, persist=False) -> WordStore:
+    '''
+    Get the store for a word list file, reading it only once per process.
+
+    Parameters
+    ----------
+    path: str, optional
+        Text file with one word per line
+    word_length: int, optional
+        Keep only the words of this length; all words must have the same
+        length if None
+    persist: bool, optional
+        Memory-map the store from its binary file if it is newer than the
+        text file, and write the binary file otherwise
+
+    Returns
+    -------
+    store: WordStore
+    '''
+    key = (path, word_length)
+    if key in _stores:
+        return _stores[key]
+    binary_path = store_path(path, word_length)
+    if persist and os.path.exists(binary_path) and os.path.getmtime(binary_path) >= os.path.getmtime(path):
+        store = WordStore.load(binary_path)
+    else:
+        with open(path, 'r') as f:
+            store = WordStore.from_list(read_words(f, word_length))
+        if persist:
+            store.save(binary_path)
+    _stores[key] = store
+    return store
+
+
+def store_for(word_list, key=None) -> WordStore:
+    '''
+    The store holding word_list: the one it was loaded through, else one made
+    for it the first time it is asked for (keyed by the hash of the list).
+
+    Parameters
+    ----------
+    word_list: list
+        Word list, usually the word_list of a store
+    key: str, optional
+        cache.word_list_hash of word_list, if already computed
+
+    Returns
+    -------
+    store: WordStore
+    '''
+    for store in _stores.values():
+        if store._word_list is word_list:
+            return store
+    key = ('list', key or cache.word_list_hash(word_list))
+    if key not in _stores:
+        _stores[key] = WordStore(patterns.encode_words(word_list), word_list)
+    return _stores[key]
+
+
+def get_length_stores(path=DEFAULT_WORDS, lengths=None) -> dict:
+    '''
+    Split a dictionary file into one store per word length, reading it once.
+    The stores are cached as get_word_store(path, length) would cache them.
+
+    Parameters
+    ----------
+    path: str, optional
+        Text file with one word per line, of any lengths
+    lengths: iterable, optional
+        Word lengths to keep; every length in the file if None
+
+    Returns
+    -------
+    stores: dict
+        WordStore keyed by word length
+    '''
+    by_length = {}
+    with open(path, 'r') as f:
+        for word in read_words(f):
+            if lengths is None or len(word) in lengths:
+                by_length.setdefault(len(word), []).append(word)
+    stores = {}
+    for word_length, word_list in sorted(by_length.items()):
+        key = (path, word_length)
+        if key not in _stores:
+            _stores[key] = WordStore.from_list(word_list)
+        stores[word_length] = _stores[key]
+    return stores
+
+
+def file_hash(path) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def web_cache_path(url) -> str:
+    '''
+    File a word list downloaded from url is kept in: web_simple.txt for
+    WEB_SIMPLE_URL, else a name holding a hash of the URL.
+    '''
+    if url == WEB_SIMPLE_URL:
+        return WEB_SIMPLE_CACHE
+    return os.path.join(cache.CACHE_DIR, 'web_%s.txt' % hashlib.sha1(url.encode()).hexdigest()[:16])
+
+
+def fetch_words(url, path) -> str:
+    '''
+    Download a word list to path, streaming it to disk line by line, and save
+    the SHA-1 of its contents to path + '.sha1'. Returns the hash.
+    '''
+    import requests
+    sha1 = hashlib.sha1()
+    with requests.get(url, stream=True, timeout=30) as r:
+        r.raise_for_status()
+        with cache.atomic_write(path) as f:
+            for line in r.iter_lines():
+                line += b'\n'
+                sha1.update(line)
+                f.write(line)
+    with cache.atomic_write(path + '.sha1', 'w') as f:
+        f.write(sha1.hexdigest() + '\n')
+    return sha1.hexdigest()
+
+
+def get_web_store(word_length, source=None, refresh=False, cache_path=None) -> WordStore:
+    '''
+    Get the store for the words of a given length of a web word list, going
+    to the network only if the list is not cached yet (or refresh is set).
+
+    Parameters
+    ----------
+    word_length: int
+        Keep only the words of this length
+    source: str, optional
+        URL to download from, or a local file to read instead; defaults to the
+        file named by the WORDLE_WEB_SIMPLE environment variable if set, else
+        WEB_SIMPLE_URL
+    refresh: bool, optional
+        Download the list again even if it is cached
+    cache_path: str, optional
+        Where the downloaded list is kept; defaults to web_cache_path(source)
+
+    Returns
+    -------
+    store: WordStore
+    '''
+    source = source or os.environ.get(WEB_SIMPLE_ENV) or WEB_SIMPLE_URL
+    if not source.startswith(('http://', 'https://')):
+        return get_word_store(source, word_length)
+    cache_path = cache_path or web_cache_path(source)
+
+    if refresh:
+        for key in [key for key in _stores if key[0] == cache_path]:
+            del _stores[key]
+    elif (cache_path, word_length) in _stores:
+        return _stores[(cache_path, word_length)]
+
+    hash_path = cache_path + '.sha1'
+    if refresh or not os.path.exists(cache_path) or not os.path.exists(hash_path):
+        fetch_words(source, cache_path)
+    else:
+        with open(hash_path) as f:
+            if f.read().strip() != file_hash(cache_path):
+                raise ValueError("%s does not match its hash; refresh the cache." % cache_path)
+    return get_word_store(cache_path, word_length)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare word lists.")
+    parser.add_argument('--refresh-web', action='store_true',
+                        help='download the web_simple word list (or the one at --url) again')
+    parser.add_argument('--url', default=WEB_SIMPLE_URL, help='where to download the web_simple list from')
+    parser.add_argument('-l', '--word-length', type=int, default=5,
+                        help='word length of the default list to save (default 5)')
+    args = parser.parse_args()
+    if args.refresh_web:
+        path = web_cache_path(args.url)
+        print('%s: sha1 %s' % (path, fetch_words(args.url, path)))
+    else:
+        # save the default word list where games memory-map it from
+        store = get_word_store(DEFAULT_WORDS, args.word_length, persist=True)
+        print('Saved %d words to %s' % (len(store), store_path(DEFAULT_WORDS, args.word_length)))